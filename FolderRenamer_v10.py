@@ -19,6 +19,7 @@ Notes:
 - Undo can only revert rename/move operations from this session, not deletions done by de-duplication.
 """
 
+import os
 import csv
 import unicodedata
 import hashlib
@@ -186,37 +187,47 @@ DEPTH_LABEL_TO_CONST = {
 }
 DEPTH_CONST_TO_LABEL = {v: k for k, v in DEPTH_LABEL_TO_CONST.items()}
 
-def _rel_depth(base: Path, p: Path) -> int:
-    return len(p.relative_to(base).parts)
+# (min, max) depth relative to base; None = no cap
+_DEPTH_RANGE = {
+    DEPTH_LEVEL1_ONLY: (1, 1),
+    DEPTH_LEVEL2_ONLY: (2, 2),
+    DEPTH_UP_TO_LEVEL2: (1, 2),
+    DEPTH_ALL: (1, None),
+}
+
+def _walk_depth(base_dir: Path, max_depth: int | None):
+    # Iterative scandir walk yielding (entry, depth). The depth rides on the
+    # stack, so no path arithmetic; folders at max_depth are never opened.
+    stack = [(str(base_dir), 1)]
+    while stack:
+        path, d = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    yield entry, d
+                    if (max_depth is None or d < max_depth) and entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, d + 1))
+        except OSError:
+            continue
 
 def collect_paths_for_bases(base_dirs: list[Path], depth_mode: str,
                             include_dirs: bool, include_files: bool) -> list[tuple[Path, Path]]:
-    results: list[tuple[Path, Path]] = []
+    lo, hi = _DEPTH_RANGE.get(depth_mode, (1, None))
+    found: list[tuple[int, Path, Path]] = []
     for base_dir in base_dirs:
-        if not base_dir.exists() or not base_dir.is_dir():
+        if not base_dir.is_dir():
             continue
-        all_paths = list(base_dir.rglob("*"))
-        for p in all_paths:
-            try:
-                d = _rel_depth(base_dir, p)
-            except ValueError:
-                continue
-            if d < 1:
-                continue
-            if p.is_dir() and not include_dirs:
-                continue
-            if p.is_file() and not include_files:
-                continue
-
-            if depth_mode == DEPTH_LEVEL1_ONLY and d != 1:
+        base_parts = len(base_dir.parts)
+        for entry, d in _walk_depth(base_dir, hi):
+            if d < lo:
                 continue
-            if depth_mode == DEPTH_LEVEL2_ONLY and d != 2:
+            if entry.is_dir() and not include_dirs:
                 continue
-            if depth_mode == DEPTH_UP_TO_LEVEL2 and d not in (1, 2):
+            if entry.is_file() and not include_files:
                 continue
-            results.append((base_dir, p))
-    results.sort(key=lambda t: len(t[1].parts), reverse=True)  # deepest-first
-    return results
+            found.append((base_parts + d, base_dir, Path(entry.path)))
+    found.sort(key=lambda t: t[0], reverse=True)  # deepest-first
+    return [(base, p) for _, base, p in found]
 
 def compute_plan(items: list[tuple[Path, Path]], replace_space: bool) -> list[tuple[Path, Path, Path]]:
     plan = []
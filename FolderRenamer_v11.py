@@ -18,10 +18,14 @@ Notes:
 - Undo reverts rename/move from this session; deletions by de-duplication are not undoable.
 """
 
+import os
 import csv
 import unicodedata
 import hashlib
 import threading
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
@@ -140,17 +144,67 @@ def transform_name(name: str, replace_space: bool) -> str:
     s = s.upper()
     return s
 
-def unique_target_path(target: Path) -> Path:
-    if not target.exists():
-        return target
+def _exact(name: str) -> str:
+    return name
+
+def _case_insensitive_dir(folder: str) -> bool:
+    """True unless an entry of `folder` shows the filesystem keeps case apart.
+
+    An ASCII entry whose case-swapped name stats as the same object means the
+    filesystem folds case (Windows, default macOS APFS); a swapped name that is
+    missing or a different object means it does not. With nothing to probe,
+    assume it folds: that can only add a suffix, never let a rename overwrite.
+    """
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return True
+    for name in names:
+        swapped = name.swapcase()
+        if swapped == name or not name.isascii():
+            continue
+        try:
+            st = os.lstat(os.path.join(folder, name))
+        except OSError:
+            continue
+        try:
+            return os.path.samestat(st, os.lstat(os.path.join(folder, swapped)))
+        except FileNotFoundError:
+            return False
+        except OSError:
+            continue
+    return True
+
+@lru_cache(maxsize=4096)
+def _name_fold(folder: str):
+    """Key function for comparing names inside `folder`, probed once per folder."""
+    return str.casefold if _case_insensitive_dir(folder) else _exact
+
+def _dir_names(folder: Path) -> set[str]:
+    """Names present in `folder` (folded as `_name_fold`), read with a single scandir."""
+    fold = _name_fold(str(folder))
+    try:
+        with os.scandir(folder) as it:
+            return {fold(e.name) for e in it}
+    except OSError:
+        return set()
+
+def unique_target_path(target: Path, taken: set[str] | None = None) -> Path:
+    """Pick `target` or the first free `<name>_<i>` sibling.
+
+    `taken` is the set of names already in the parent folder (see `_dir_names`);
+    pass it in to reuse one listing across a batch, otherwise it is scanned here.
+    """
+    if taken is None:
+        taken = _dir_names(target.parent)
+    fold = _name_fold(str(target.parent))
     stem = target.name
-    base = target.parent
+    if fold(stem) not in taken:
+        return target
     i = 1
-    while True:
-        candidate = base / f"{stem}_{i}"
-        if not candidate.exists():
-            return candidate
+    while fold(f"{stem}_{i}") in taken:
         i += 1
+    return target.parent / f"{stem}_{i}"
 
 def file_sha256(p: Path, chunk: int = 1 << 20) -> str:
     h = hashlib.sha256()
@@ -162,6 +216,40 @@ def file_sha256(p: Path, chunk: int = 1 << 20) -> str:
             h.update(b)
     return h.hexdigest()
 
+# Above this many candidate bytes, hash in worker processes instead of threads.
+HASH_PROCESS_POOL_BYTES = 512 * 1024 * 1024
+
+def _stat_key(p: Path) -> tuple[int, int, int, int]:
+    # Identifies the file contents, not the name: survives a rename, changes on write
+    st = p.stat()
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+def hash_files(paths: list[Path], total_bytes: int = 0) -> dict[tuple, str]:
+    """SHA-256 of each path keyed by _stat_key(path); unreadable files are left out."""
+    if not paths:
+        return {}
+    cpus = os.cpu_count() or 1
+    if total_bytes > HASH_PROCESS_POOL_BYTES and cpus > 2:
+        # spawn keeps the Tk process state out of the workers on every platform
+        pool = ProcessPoolExecutor(max_workers=min(cpus - 1, 8),
+                                   mp_context=multiprocessing.get_context("spawn"))
+    else:
+        pool = ThreadPoolExecutor(max_workers=min(cpus, 8))
+    digests = {}
+    with pool:
+        futures = {}
+        for p in paths:
+            try:
+                futures[_stat_key(p)] = pool.submit(file_sha256, p)
+            except OSError:
+                continue
+        for key, fut in futures.items():
+            try:
+                digests[key] = fut.result()
+            except Exception:
+                pass
+    return digests
+
 # --------- Depth options ----------
 DEPTH_LEVEL1_ONLY = "LEVEL1_ONLY"
 DEPTH_LEVEL2_ONLY = "LEVEL2_ONLY"
@@ -266,6 +354,8 @@ class App(ttk.Frame):
         self.preview_rows: list[tuple[Path, Path, Path]] = []
         self.applied_rows: list[tuple[Path, Path, Path, Path]] = []
         self.applied_info_rows: list[tuple[Path, str, str, str, str]] = []
+        # Treeview row id per current path, so rename/undo can update rows in place
+        self._row_iids: dict[str, str] = {}
 
         # Progress state
         self._busy = False
@@ -614,6 +704,23 @@ class App(ttk.Frame):
     def _clear_tree(self):
         for iid in self.tree.get_children():
             self.tree.delete(iid)
+        self._row_iids.clear()
+
+    def _upsert_row(self, key: str, values: tuple, tag: str):
+        """Update the row shown for `key` in place, or append it if there is none."""
+        iid = self._row_iids.get(key)
+        if iid is not None and self.tree.exists(iid):
+            self.tree.item(iid, values=values, tags=(tag,))
+        else:
+            self._row_iids[key] = self.tree.insert("", "end", values=values, tags=(tag,))
+
+    def _set_row_status(self, keys, status: str):
+        """Replace the Status column of the rows shown for `keys` and tag them as info."""
+        for key in keys:
+            iid = self._row_iids.get(key)
+            if iid is not None and self.tree.exists(iid):
+                values = self.tree.item(iid, "values")
+                self.tree.item(iid, values=(*values[:4], status), tags=("info",))
 
     # ---------- Depth ----------
     def _depth_mode(self) -> str:
@@ -684,9 +791,7 @@ class App(ttk.Frame):
                     self.tree.insert("", "end", values=("", "", "(unchanged)", "No changes", ""), tags=("info",))
                     return
                 for base, old, new in sorted(plan, key=lambda t: (str(t[0]).lower(), str(t[1]).lower())):
-                    self.tree.insert("", "end",
-                                     values=(str(base), _kind_of(old), str(old), str(new), "Preview"),
-                                     tags=("preview",))
+                    self._upsert_row(str(old), (str(base), _kind_of(old), str(old), str(new), "Preview"), "preview")
             self.after(0, done_ui)
 
         threading.Thread(target=worker, daemon=True).start()
@@ -718,7 +823,6 @@ class App(ttk.Frame):
                 return
 
         self._set_busy(True)
-        self._clear_tree()
         self.run_log.delete(0, "end")
 
         total = len(self.preview_rows)
@@ -728,6 +832,46 @@ class App(ttk.Frame):
         info_rows = []
 
         def worker():
+            # One directory listing per parent for the whole batch; kept in sync below.
+            taken_by_dir: dict[Path, set[str]] = {}
+
+            def _unique(target: Path) -> Path:
+                taken = taken_by_dir.get(target.parent)
+                if taken is None:
+                    taken = taken_by_dir[target.parent] = _dir_names(target.parent)
+                return unique_target_path(target, taken)
+
+            def _moved(src: Path, dst: Path | None):
+                taken = taken_by_dir.get(src.parent)
+                if taken is not None:
+                    taken.discard(_name_fold(str(src.parent))(src.name))
+                if dst is not None:
+                    taken = taken_by_dir.get(dst.parent)
+                    if taken is not None:
+                        taken.add(_name_fold(str(dst.parent))(dst.name))
+
+            # Merge mode: hash every file/file collision up front, in parallel.
+            digests: dict[tuple, str] = {}
+            if self.collision_mode == COL_MERGE_HASH:
+                self._progress_update(msg="Hashing duplicates…")
+                to_hash: dict[str, Path] = {}
+                total_bytes = 0
+                for _base, old, intended_new in self.preview_rows:
+                    try:
+                        if old.is_file() and intended_new.is_file():
+                            for fp in (old, intended_new):
+                                if str(fp) not in to_hash:
+                                    to_hash[str(fp)] = fp
+                                    total_bytes += fp.stat().st_size
+                    except OSError:
+                        continue
+                digests = hash_files(list(to_hash.values()), total_bytes)
+
+            def _digest(fp: Path) -> str:
+                # An earlier rename in this loop may have moved another file onto fp
+                d = digests.get(_stat_key(fp))
+                return d if d is not None else file_sha256(fp)
+
             step = 0
             for base, old, intended_new in self.preview_rows:
                 step += 1
@@ -736,36 +880,42 @@ class App(ttk.Frame):
                 try:
                     if not intended_new.exists():
                         old.rename(intended_new)
+                        _moved(old, intended_new)
                         applied.append((base, old, intended_new, intended_new))
                         continue
 
                     # conflict
                     if self.collision_mode == COL_SUFFIX:
-                        actual_target = unique_target_path(intended_new)
+                        actual_target = _unique(intended_new)
                         old.rename(actual_target)
+                        _moved(old, actual_target)
                         applied.append((base, old, intended_new, actual_target))
                     else:
                         if old.is_file() and intended_new.is_file():
                             try:
-                                if file_sha256(old) == file_sha256(intended_new):
+                                if _digest(old) == _digest(intended_new):
                                     old.unlink()
+                                    _moved(old, None)
                                     info_rows.append((base, "FILE", str(old), str(intended_new),
                                                       "Duplicate removed (same hash)"))
                                 else:
-                                    actual_target = unique_target_path(intended_new)
+                                    actual_target = _unique(intended_new)
                                     old.rename(actual_target)
+                                    _moved(old, actual_target)
                                     applied.append((base, old, intended_new, actual_target))
                             except Exception:
-                                actual_target = unique_target_path(intended_new)
+                                actual_target = _unique(intended_new)
                                 old.rename(actual_target)
+                                _moved(old, actual_target)
                                 applied.append((base, old, intended_new, actual_target))
                         elif old.is_dir() and intended_new.is_dir():
                             stats = merge_dirs(old, intended_new)
                             note = f"Merged dir (moved:{stats['moved']}, dups:{stats['deleted_dups']}, kept_both:{stats['conflicts']})"
                             info_rows.append((base, "DIR", str(old), str(intended_new), note))
                         else:
-                            actual_target = unique_target_path(intended_new)
+                            actual_target = _unique(intended_new)
                             old.rename(actual_target)
+                            _moved(old, actual_target)
                             applied.append((base, old, intended_new, actual_target))
 
                 except Exception as e:
@@ -775,8 +925,8 @@ class App(ttk.Frame):
             def done_ui():
                 self._progress_stop("Rename done.")
                 self._set_busy(False)
-                self.applied_rows[:] = applied
-                self.applied_info_rows[:] = info_rows
+                self.applied_rows = applied
+                self.applied_info_rows = info_rows
 
                 any_rows = False
                 if applied:
@@ -784,20 +934,20 @@ class App(ttk.Frame):
                     for base, old, intended, actual in sorted(applied, key=lambda t: (str(t[0]).lower(), str(t[1]).lower())):
                         status = "Renamed" if actual == intended else "Renamed (conflict ➜ unique path)"
                         tag = "renamed" if actual == intended else "conflict"
-                        self.tree.insert("", "end",
-                                         values=(str(base), _kind_of(old), str(old), str(actual), status),
-                                         tags=(tag,))
+                        self._upsert_row(str(old), (str(base), _kind_of(old), str(old), str(actual), status), tag)
                 if info_rows:
                     any_rows = True
                     for base, kind, src, dst, status in info_rows:
                         tag = "merge" if "Merged" in status else ("dupdel" if "Duplicate removed" in status else "info")
-                        self.tree.insert("", "end",
-                                         values=(str(base), kind, src, dst, status),
-                                         tags=(tag,))
+                        self._upsert_row(src, (str(base), kind, src, dst, status), tag)
                 if not any_rows:
+                    self._clear_tree()
                     self.tree.insert("", "end", values=("", "", "", "Nothing renamed", ""), tags=("info",))
                     messagebox.showinfo("Done", "No changes executed.")
                 else:
+                    # Planned rows that failed or were skipped keep no stale "Preview"
+                    touched = {str(t[1]) for t in applied} | {t[2] for t in info_rows}
+                    self._set_row_status(self._row_iids.keys() - touched, "Not renamed")
                     messagebox.showinfo("Done", f"Processed {len(applied)} rename(s) and {len(info_rows)} merge/de-dupe action(s).")
             self.after(0, done_ui)
 
@@ -818,33 +968,29 @@ class App(ttk.Frame):
             )
 
         self._set_busy(True)
-        self._clear_tree()
         self._progress_start("determinate", "Undoing…", total=len(self.applied_rows))
 
         undone = []
 
         def worker():
-            from itertools import count
-            for i, (base, old, intended, actual) in zip(count(1), sorted(self.applied_rows, key=lambda t: len(t[3].parts), reverse=True)):
+            for i, (base, old, intended, actual) in enumerate(sorted(self.applied_rows, key=lambda t: len(t[3].parts), reverse=True), 1):
                 self._progress_update(step=i, msg="Undoing…", current_folder=str(base))
                 try:
                     back_target = old if not old.exists() else unique_target_path(old)
                     actual.rename(back_target)
-                    undone.append((actual, back_target))
+                    undone.append((old, actual, back_target))
                 except Exception as e:
                     print(f"[ERROR] Undo failed '{actual}' -> '{old}': {e}")
 
             def done_ui():
                 self._progress_stop("Undo done.")
                 self._set_busy(False)
-                for src, dst in sorted(undone, key=lambda t: str(t[0]).lower()):
-                    self.tree.insert("", "end",
-                                     values=("", _kind_of(dst), str(src), str(dst), "Undone"),
-                                     tags=("undo",))
+                for old, src, dst in sorted(undone, key=lambda t: str(t[1]).lower()):
+                    self._upsert_row(str(old), ("", _kind_of(dst), str(src), str(dst), "Undone"), "undo")
                 for base, kind, src, dst, status in self.applied_info_rows:
-                    self.tree.insert("", "end",
-                                     values=(str(base), kind, src, dst, status + " (not undoable)"),
-                                     tags=("info",))
+                    self._upsert_row(src, (str(base), kind, src, dst, status + " (not undoable)"), "info")
+                failed = {str(t[1]) for t in self.applied_rows} - {str(t[0]) for t in undone}
+                self._set_row_status(failed, "Undo failed")
                 self.applied_rows.clear()
                 messagebox.showinfo("Undo", f"Undone {len(undone)} item(s).")
             self.after(0, done_ui)
@@ -20,18 +20,32 @@ Notes:
   * Merge deletions are NOT undoable (guarded by explicit status tags).
 - Performance:
   * Uses streaming hash (chunk=1MB) for large files.
+  * Duplicate check uses BLAKE3 if the optional `blake3` package is installed, else SHA-256
+    (content comparison only, not a signature); files up to 64 KB are compared byte-for-byte.
   * Progress bar shows current folder path + counters.
 
 Copyright: NCT — for educational/internal use.
 """
 
-import csv
+import os
+import stat
+import functools
 import unicodedata
-import hashlib
 import threading
+import time
+import queue
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, messagebox
+# csv, hashlib (OpenSSL), mmap and filedialog are imported where used, keeping them off startup
+
+try:
+    from blake3 import blake3 as _blake3  # optional, faster dedup digest
+except ImportError:
+    _blake3 = None
 
 # --- i18n (EN ⇄ VI) -----------------------------------------------------------
 SUPPORTED_LANGS = ("vi", "en")
@@ -89,26 +103,144 @@ except NameError:
     SCRIPT_NAME = "FolderFileRenamer_GUI.py"
 print(f"[INFO] Running: {SCRIPT_NAME}")
 
+# --------- Naming transforms ----------
+TRANSFORM_TO_UPPER = True
+REPLACE_SPACE = True
+REMOVE_ACCENTS = True
+
 # --------- Helpers ----------
 
+class _CombiningTable(dict):
+    """str.translate table that drops combining marks; each codepoint is classified once."""
+    def __missing__(self, cp: int):
+        v = None if unicodedata.combining(chr(cp)) else cp
+        self[cp] = v
+        return v
+
+_DASH_TABLE = str.maketrans({"-": "_"})
+_DASH_SPACE_TABLE = str.maketrans({"-": "_", " ": "_"})
+_ACCENT_TABLE = _CombiningTable(_DASH_TABLE)
+_ACCENT_SPACE_TABLE = _CombiningTable(_DASH_SPACE_TABLE)
+_STRIP_TABLE = _CombiningTable()
+
 def strip_accents(s: str) -> str:
-    return "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
+    return unicodedata.normalize("NFKD", s).translate(_STRIP_TABLE)
 
-def to_upper(s: str) -> str:
-    return s.upper()
+def make_name_transform(replace_space: bool = REPLACE_SPACE):
+    """Build the name transform once for the current flags, so each name costs one call."""
+    normalize = unicodedata.normalize
+    if REMOVE_ACCENTS:
+        table = _ACCENT_SPACE_TABLE if replace_space else _ACCENT_TABLE
+        if TRANSFORM_TO_UPPER:
+            return lambda s: normalize("NFKD", s).translate(table).upper()
+        return lambda s: normalize("NFKD", s).translate(table)
+    table = _DASH_SPACE_TABLE if replace_space else _DASH_TABLE
+    if TRANSFORM_TO_UPPER:
+        return lambda s: s.translate(table).upper()
+    return lambda s: s.translate(table)
 
-def replace_space_with_underscore(s: str) -> str:
-    return s.replace(" ", "_")
+def normalize_name(s: str, replace_space: bool = REPLACE_SPACE) -> str:
+    """'-' (and optionally ' ') -> '_', accents stripped, UPPERCASE; one translate pass."""
+    return make_name_transform(replace_space)(s)
 
 CHUNK_SIZE = 1024 * 1024
+MMAP_MIN_SIZE = 16 * 1024 * 1024
+
+def _new_sha256():
+    import hashlib
+    # Content comparison only, so OpenSSL may pick its fastest non-FIPS path
+    return hashlib.new("sha256", usedforsecurity=False)
 
 def sha256_file(p: Path) -> str:
-    h = hashlib.sha256()
-    with p.open("rb") as f:
-        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
-            h.update(chunk)
+    import hashlib
+    import mmap
+    if os.name != "nt" and p.stat().st_size >= MMAP_MIN_SIZE:
+        # Large file: hash the page-cache mapping directly, no user-space copy
+        with p.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            h = _new_sha256()
+            h.update(mm)
+            return h.hexdigest()
+    if hasattr(hashlib, "file_digest"):
+        # Python 3.11+: the read/update loop runs in C
+        with p.open("rb", buffering=0) as f:
+            return hashlib.file_digest(f, _new_sha256).hexdigest()
+    # Older Pythons: refill one preallocated buffer instead of a new bytes per chunk
+    h = _new_sha256()
+    buf = bytearray(CHUNK_SIZE)
+    mv = memoryview(buf)
+    with p.open("rb", buffering=0) as f:
+        while n := f.readinto(mv):
+            h.update(mv[:n] if n < CHUNK_SIZE else mv)
     return h.hexdigest()
 
+def content_digest(p: Path) -> str:
+    # Dedup only, never a signature: BLAKE3 (SIMD, multi-threaded) when installed
+    if _blake3 is None:
+        return sha256_file(p)
+    import mmap
+    with p.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return _blake3().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _blake3(mm, max_threads=_blake3.AUTO).hexdigest()
+
+# (st_dev, st_ino, st_size, st_mtime_ns) -> hex digest; cleared per rename run
+_HASH_CACHE: dict[tuple[int, int, int, int], str] = {}
+
+def cached_digest(p: Path) -> str:
+    st = os.stat(p)
+    key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+    digest = _HASH_CACHE.get(key)
+    if digest is None:
+        digest = _HASH_CACHE[key] = content_digest(p)
+    return digest
+
+def clear_hash_cache():
+    _HASH_CACHE.clear()
+
+# hashlib releases the GIL while hashing, so the two sides of a pair really overlap
+_HASH_POOL = ThreadPoolExecutor(max_workers=2)
+# merge_dirs: all file/file collisions of one directory are compared concurrently
+_BULK_HASH_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1))
+
+HEAD_SAMPLE = 4096
+SMALL_COMPARE = 64 * 1024  # at or below this, reading both files beats hashing
+
+def same_file_links(a: Path, b: Path) -> int:
+    """0 if a and b are different files, else their shared st_nlink.
+
+    Above 1, b is a hard link of a and dropping a keeps the data; exactly 1
+    means both paths name the same entry (e.g. a case-only difference).
+    """
+    sa = os.stat(a, follow_symlinks=False)
+    sb = os.stat(b)
+    if sa.st_ino and (sa.st_dev, sa.st_ino) == (sb.st_dev, sb.st_ino):
+        return sa.st_nlink
+    return 0
+
+def files_identical(a: Path, b: Path, pair_pool: bool = True) -> bool:
+    """Same content? Size and first bytes are compared before paying for a digest.
+
+    Small files are simply compared in full. With `pair_pool` the two files are
+    hashed concurrently; callers that already run comparisons in parallel pass
+    False and hash both sides in their thread.
+    """
+    size = a.stat().st_size
+    if size != b.stat().st_size:
+        return False
+    with a.open("rb") as fa, b.open("rb") as fb:
+        if size <= SMALL_COMPARE:
+            return fa.read() == fb.read()
+        if fa.read(HEAD_SAMPLE) != fb.read(HEAD_SAMPLE):
+            return False
+    if not pair_pool:
+        return cached_digest(a) == cached_digest(b)
+    fut = _HASH_POOL.submit(cached_digest, a)
+    digest_b = cached_digest(b)
+    return fut.result() == digest_b
+
 # --------- Depth modes ----------
 DEPTH_L1 = "Level 1"
 DEPTH_L2 = "Level 2"
@@ -122,67 +254,218 @@ DEPTH_LABEL_TO_CONST = {
     "All levels": DEPTH_ALL,
 }
 
-# --------- Move plan rows ----------
-# base, kind, current, new
+# (min, max) level relative to base; None = no cap
+_DEPTH_RANGE = {
+    DEPTH_L1: (1, 1),
+    DEPTH_L2: (2, 2),
+    DEPTH_UP_TO_2: (1, 2),
+    DEPTH_ALL: (1, None),
+}
 
-# --------- Naming transforms ----------
-TRANSFORM_TO_UPPER = True
-REPLACE_SPACE = True
-REMOVE_ACCENTS = True
+def _scandir_walk(base, depth_mode: str, want_dirs: bool, want_files: bool):
+    # Iterative scandir walk yielding (path, "DIR"/"FILE"). DirEntry type checks
+    # use the cached d_type (no stat), and levels past the cap are never opened.
+    lo, hi = _DEPTH_RANGE.get(depth_mode, (1, None))
+    stack = [(os.fspath(base), 1)]
+    while stack:
+        path, level = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        is_file = not is_dir and entry.is_file(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if level >= lo and ((is_dir and want_dirs) or (is_file and want_files)):
+                        yield entry.path, ("DIR" if is_dir else "FILE")
+                    if is_dir and (hi is None or level < hi):
+                        stack.append((entry.path, level + 1))
+        except OSError:
+            continue
+
+# --------- Move plan rows ----------
+# base, kind, current, new, status
+PREVIEW_BATCH = 200  # rows handed to the Treeview per UI callback
+PREVIEW_QUEUE_MAX = 64  # preview batches in flight between scanner and Tk
+PREVIEW_WORKERS = 8  # base folders walked at once
+PROGRESS_TICK_MS = 50  # progress label/bar refresh at most ~20 Hz
+TAG_BATCH = 100  # row status tags per UI callback during Rename
+RENAME_WORKERS = min(32, (os.cpu_count() or 1) * 4)  # parallel folders in Suffix mode
+# POSIX: rename relative to an open parent fd (renameat), not a full path walk per call
+DIR_FD_RENAME = os.rename in os.supports_dir_fd
 
 # --------- Inspect path kind ----------
 
-def kind_of(p: Path) -> str:
-    if p.is_dir():
+def kind_of(p) -> str:
+    # One stat instead of is_dir() + is_file(); planned rows carry their kind
+    # from the scan, so this is only needed for the other side of a collision
+    try:
+        mode = os.stat(p).st_mode
+    except OSError:
+        return "OTHER"
+    if stat.S_ISDIR(mode):
         return "DIR"
-    if p.is_file():
+    if stat.S_ISREG(mode):
         return "FILE"
     return "OTHER"
 
+def is_dir_path(s: str) -> bool:
+    # exists() + is_dir() in one stat; unreadable or malformed paths are "no"
+    try:
+        return stat.S_ISDIR(os.stat(s).st_mode)
+    except (OSError, ValueError):
+        return False
+
 # --------- Collision modes ----------
 COL_SUFFIX = "SUFFIX"
 COL_MERGE_HASH = "MERGE_HASH"
 
+def _exact(name: str) -> str:
+    return name
+
+def _case_insensitive_dir(folder: str) -> bool:
+    # Probe a real entry: an ASCII name whose case-swapped spelling stats as
+    # the same object means the filesystem folds case (Windows, default APFS);
+    # a missing or different object means it does not. normcase can't tell
+    # (it folds nothing on macOS). Unsure -> fold: that only adds a suffix,
+    # it never lets a rename overwrite.
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return True
+    for name in names:
+        swapped = name.swapcase()
+        if swapped == name or not name.isascii():
+            continue
+        try:
+            st = os.lstat(os.path.join(folder, name))
+        except OSError:
+            continue
+        try:
+            return os.path.samestat(st, os.lstat(os.path.join(folder, swapped)))
+        except FileNotFoundError:
+            return False
+        except OSError:
+            continue
+    return True
+
+@functools.lru_cache(maxsize=4096)
+def name_fold(folder: str):
+    # How names compare inside folder; probed once per folder
+    return str.casefold if _case_insensitive_dir(folder) else _exact
+
+def name_key(path: str) -> str:
+    # path's basename as its parent folder compares it
+    head, name = os.path.split(path)
+    return name_fold(head)(name)
+
+def dir_names(folder) -> set[str]:
+    # Folded names in folder from one scandir; replaces per-probe exists()
+    fold = name_fold(os.fspath(folder))
+    try:
+        with os.scandir(folder) as it:
+            return {fold(e.name) for e in it}
+    except OSError:
+        return set()
+
+def free_name(target: str, taken: set[str]) -> str:
+    # target itself, or the first target_1, target_2 … not in taken
+    head, name = os.path.split(target)
+    fold = name_fold(head)
+    if fold(name) not in taken:
+        return target
+    # same stem/suffix split as Path, without building one
+    dot = name.rfind(".")
+    stem, ext = (name[:dot], name[dot:]) if 0 < dot < len(name) - 1 else (name, "")
+    i = 1
+    while fold(f"{stem}_{i}{ext}") in taken:
+        i += 1
+    return os.path.join(head, f"{stem}_{i}{ext}")
+
 def merge_dirs(src: Path, dst: Path) -> dict:
     stats = {"moved": 0, "deleted_dups": 0, "conflicts": 0}
     if not dst.exists():
         src.rename(dst)
         stats["moved"] += 1
         return stats
-    for child in list(src.iterdir()):
-        t = dst / child.name
-        if child.is_dir() and t.exists() and t.is_dir():
-            sub = merge_dirs(child, t)
-            for k, v in sub.items():
-                stats[k] = stats.get(k, 0) + v
-        else:
-            if child.is_file() and t.exists() and t.is_file():
+    # Explicit work stack of (src, dst) pairs instead of recursion
+    stack = [(src, dst)]
+    visited = []  # source dirs in visit order (parents before children)
+    while stack:
+        src_dir, dst_dir = stack.pop()
+        visited.append(src_dir)
+        # One listing per side; DirEntry carries the type, so no per-child stat
+        fold = name_fold(os.fspath(dst_dir))
+        with os.scandir(dst_dir) as it:
+            dst_entries = {fold(e.name): e for e in it}
+        existing = set(dst_entries)  # names taken in dst_dir, kept current as we move in
+        with os.scandir(src_dir) as it:
+            children = list(it)
+        # Start every file/file comparison up front; unlink/rename below stays serial.
+        # Pairs that already share an inode need no hashing at all.
+        pairs = []
+        links = {}  # entry.path -> shared st_nlink for same-inode pairs
+        for e in children:
+            if not e.is_file(follow_symlinks=False):
+                continue
+            te = dst_entries.get(fold(e.name))
+            if te is None or not te.is_file():
+                continue
+            try:
+                n = same_file_links(Path(e.path), Path(te.path))
+            except OSError:
+                n = 0
+            if n:
+                links[e.path] = n
+            else:
+                pairs.append(e)
+        compares = {}
+        if len(pairs) > 1:
+            compares = {e.path: _BULK_HASH_POOL.submit(files_identical, Path(e.path), dst_dir / e.name, False)
+                        for e in pairs}
+        for entry in children:
+            child = Path(entry.path)
+            t = dst_dir / entry.name
+            t_entry = dst_entries.get(fold(entry.name))
+            if entry.is_dir(follow_symlinks=False) and t_entry is not None and t_entry.is_dir():
+                stack.append((child, t))
+                continue
+            if entry.path in links:
+                if links[entry.path] > 1:
+                    # hard link of the destination file: drop this name only
+                    try:
+                        child.unlink()
+                        stats["deleted_dups"] += 1
+                    except OSError:
+                        stats["conflicts"] += 1
+                # nlink == 1: both paths are the same entry, leave it alone
+                continue
+            if entry.is_file(follow_symlinks=False) and t_entry is not None and t_entry.is_file():
                 # Check duplicates by hash
                 try:
-                    if sha256_file(child) == sha256_file(t):
+                    fut = compares.get(entry.path)
+                    same = fut.result() if fut is not None else files_identical(child, t)
+                    if same:
                         child.unlink()
                         stats["deleted_dups"] += 1
                         continue
                 except Exception:
                     stats["conflicts"] += 1
-            # Move/rename
-            base_name = t.name
-            if t.exists():
-                i = 1
-                while True:
-                    cand = t.with_name(f"{t.stem}_{i}{t.suffix}")
-                    if not cand.exists():
-                        t = cand
-                        break
-                    i += 1
-            child.rename(t)
+            # Move/rename (the cached listing already says whether t is taken)
+            t = free_name(str(t), existing)
+            os.rename(entry.path, t)
+            existing.add(fold(os.path.basename(t)))
             stats["moved"] += 1
-    # Remove empty src
-    try:
-        if not any(src.iterdir()):
-            src.rmdir()
-    except Exception:
-        pass
+    # Remove emptied source dirs, deepest first
+    for src_dir in reversed(visited):
+        try:
+            with os.scandir(src_dir) as it:
+                empty = next(it, None) is None
+            if empty:
+                src_dir.rmdir()
+        except OSError:
+            pass
     return stats
 
 # --------- GUI ----------
@@ -273,10 +556,15 @@ class App(ttk.Frame):
         # State
         self.current_theme = tk.StringVar(value="PharmApp Light")  # default
         self.current_lang = tk.StringVar(value="vi")
+        # Active I18N dict, refreshed whenever current_lang is written
+        self._tr_dict = I18N["vi"]
+        self.current_lang.trace_add("write", self._refresh_tr_cache)
         self.include_dirs = tk.BooleanVar(value=True)
         self.include_files = tk.BooleanVar(value=False)
         self.replace_space = tk.BooleanVar(value=True)
         self.depth_label = tk.StringVar(value="All levels")
+        self._transform = make_name_transform(True)  # rebuilt from the options on each Preview
+        self._replace_space = True
 
         self.collision_label = tk.StringVar(value="Suffix _1")
         self.collision_mode = COL_SUFFIX
@@ -284,7 +572,10 @@ class App(ttk.Frame):
         self.single_path_var = tk.StringVar()
         self.base_dirs: list[Path] = []
 
-        self.preview_rows: list[tuple[Path, Path, Path]] = []
+        self.preview_rows: list[tuple[str, str, str, str, str]] = []  # base, kind, src, dst, status
+        self._busy = False
+        self._plan_names: dict[str, set[str]] = {}  # parent -> names, per Preview
+        self._cancel_preview = threading.Event()
 
         # Progress state vars
         self.progress_var = tk.DoubleVar(value=0)
@@ -292,6 +583,14 @@ class App(ttk.Frame):
         self.progress_msg = tk.StringVar(value="Ready")
         self.counter_msg = tk.StringVar(value="0/0")
         self.current_folder_var = tk.StringVar(value="-")
+        # Run log lines waiting for the next batched insert
+        self._run_log_pending: deque[str] = deque()
+        self._run_log_last: str | None = None
+        self._run_log_job = None
+        # Newest progress values from workers; drained to Tk at most every PROGRESS_TICK_MS
+        self._progress_lock = threading.Lock()
+        self._progress_pending: dict = {}
+        self._progress_tick_queued = False
 
         # Theme manager
         self.tm = ThemeManager(master)
@@ -305,12 +604,14 @@ class App(ttk.Frame):
         self._apply_language()
         self._on_collision_mode_change()
 
-    def _tr(self, key: str) -> str:
-        lang = getattr(self, "current_lang", None)
-        lang = lang.get() if hasattr(lang, "get") else "vi"
+    def _refresh_tr_cache(self, *_):
+        lang = self.current_lang.get()
         if lang not in SUPPORTED_LANGS:
             lang = "vi"
-        return I18N.get(lang, I18N["vi"]).get(key, key)
+        self._tr_dict = I18N[lang]
+
+    def _tr(self, key: str) -> str:
+        return self._tr_dict.get(key, key)
 
     def _apply_language(self):
         def safe_set(w, text):
@@ -396,6 +697,7 @@ class App(ttk.Frame):
         root.bind("<Control-s>",    lambda e: self._save_csv())
         root.bind("<Control-z>",    lambda e: self._undo_last())
         root.bind("<Control-t>",    lambda e: self._apply_theme())
+        root.bind("<Escape>",       lambda e: self._cancel_preview.set())
         # Bases management
         root.bind("<Control-o>",        lambda e: self._add_folder_dialog())
         root.bind("<Control-Shift-O>",  lambda e: self._add_many_dialog())
@@ -597,6 +899,7 @@ class App(ttk.Frame):
             pass
 
     def _ask_directory(self, title: str) -> Path | None:
+        from tkinter import filedialog
         try:
             p = filedialog.askdirectory(title=title)
             if p:
@@ -619,12 +922,21 @@ class App(ttk.Frame):
         return None
 
     def _refresh_base_listbox(self):
-        self.base_listbox.delete(0, "end")
-        for p in self.base_dirs:
-            try:
-                self.base_listbox.insert("end", str(p))
-            except Exception:
-                pass
+        # Keep the unchanged leading rows; only rewrite the tail that differs
+        want = [str(p) for p in self.base_dirs]
+        have = self.base_listbox.get(0, "end")
+        keep = 0
+        for a, b in zip(have, want):
+            if a != b:
+                break
+            keep += 1
+        try:
+            if keep < len(have):
+                self.base_listbox.delete(keep, "end")
+            if keep < len(want):
+                self.base_listbox.insert("end", *want[keep:])
+        except Exception:
+            pass
 
     def _toggle_bulk_box(self):
         self._bulk_visible = not self._bulk_visible
@@ -651,30 +963,65 @@ class App(ttk.Frame):
                 self.counter_msg.set("-")
                 self.progressbar.start(12)
             else:
-                total = 0 if total is None else total
-                self.progressbar.config(mode="determinate", maximum=max(total, 1))
-                self.progress_total = max(total, 1)
+                n = 0 if total is None else total
+                self.progressbar.stop()  # _set_busy may have started the busy animation
+                self.progressbar.config(mode="determinate", maximum=max(n, 1))
+                self.progress_total = max(n, 1)
                 self.progress_var.set(0)
                 self.counter_msg.set(f"0/{self.progress_total}")
         self.after(0, _start)
 
     def _progress_update(self, step: int | None = None, msg: str | None = None, current_folder: str | None = None):
-        def _upd():
+        # Only latch the values here; _tick_progress pushes the newest ones to Tk
+        with self._progress_lock:
+            if step is not None:
+                self._progress_pending["step"] = step
             if msg is not None:
-                self.progress_msg.set(msg)
+                self._progress_pending["msg"] = msg
             if current_folder is not None:
-                self.current_folder_var.set(current_folder)
-                # also log the folder (only when it changes)
-                if (not self.run_log.size()) or (self.run_log.get("end") != current_folder):
-                    self.run_log.insert("end", current_folder)
-                    self.run_log.yview_moveto(1.0)
-            if self.progressbar["mode"] == "determinate" and step is not None:
-                self.progress_var.set(step)
-                self.counter_msg.set(f"{step}/{int(self.progress_total)}")
-        self.after(0, _upd)
+                self._progress_pending["folder"] = current_folder
+                # every folder change still goes to the run log
+                if current_folder != self._run_log_last:
+                    self._run_log_last = current_folder
+                    self._run_log_pending.append(current_folder)
+            if self._progress_tick_queued:
+                return
+            self._progress_tick_queued = True
+        self.after(PROGRESS_TICK_MS, self._tick_progress)
+
+    def _tick_progress(self):
+        with self._progress_lock:
+            self._progress_tick_queued = False
+        self._apply_pending_progress()
+
+    def _apply_pending_progress(self):
+        with self._progress_lock:
+            pending, self._progress_pending = self._progress_pending, {}
+        if "msg" in pending:
+            self.progress_msg.set(pending["msg"])
+        if "folder" in pending:
+            self.current_folder_var.set(pending["folder"])
+        step = pending.get("step")
+        if step is not None and self.progressbar["mode"] == "determinate":
+            self.progress_var.set(step)
+            self.counter_msg.set(f"{step}/{int(self.progress_total)}")
+        if self._run_log_pending and self._run_log_job is None:
+            self._flush_run_log()
+
+    def _flush_run_log(self):
+        # Drain up to 500 queued lines with a single Listbox insert
+        self._run_log_job = None
+        n = min(500, len(self._run_log_pending))
+        batch = [self._run_log_pending.popleft() for _ in range(n)]
+        if batch:
+            self.run_log.insert("end", *batch)
+            self.run_log.yview_moveto(1.0)
+        if self._run_log_pending:
+            self._run_log_job = self.after(100, self._flush_run_log)
 
     def _progress_finish(self, msg: str = "Done."):
         def _fin():
+            self._apply_pending_progress()
             try:
                 self.progressbar.stop()
             except Exception:
@@ -727,15 +1074,15 @@ class App(ttk.Frame):
                 s = piece.strip().strip('"').strip("'")
                 if s:
                     parts.append(s)
+        # Drop repeats, then one stat per path, run in parallel (slow mounts)
+        parts = list(dict.fromkeys(parts))
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(parts)))) as pool:
+            flags = list(pool.map(is_dir_path, parts))
         ok = 0
-        for s in parts:
-            try:
-                p = Path(s)
-                if p.exists() and p.is_dir():
-                    self.base_dirs.append(p)
-                    ok += 1
-            except Exception:
-                pass
+        for s, is_dir in zip(parts, flags):
+            if is_dir:
+                self.base_dirs.append(Path(s))
+                ok += 1
         self._refresh_base_listbox()
         messagebox.showinfo("Bulk", f"Added {ok} folder(s).")
 
@@ -757,181 +1104,316 @@ class App(ttk.Frame):
 
     def _collect_targets(self, base: Path):
         # Collect based on settings
-        kinds = []
-        if self.include_dirs.get():
-            kinds.append("dir")
-        if self.include_files.get():
-            kinds.append("file")
         depth = DEPTH_LABEL_TO_CONST.get(self.depth_label.get(), DEPTH_ALL)
-
-        items = []
-        if depth == DEPTH_L1:
-            it = list(base.iterdir())
-            for p in it:
-                if (p.is_dir() and "dir" in kinds) or (p.is_file() and "file" in kinds):
-                    items.append(p)
-        elif depth == DEPTH_L2:
-            for p in list(base.iterdir()):
-                if (p.is_dir() and "dir" in kinds) or (p.is_file() and "file" in kinds):
-                    items.append(p)
-                if p.is_dir():
-                    for q in list(p.iterdir()):
-                        if (q.is_dir() and "dir" in kinds) or (q.is_file() and "file" in kinds):
-                            items.append(q)
-        elif depth == DEPTH_UP_TO_2:
-            # Level 1 + Level 2
-            for p in list(base.iterdir()):
-                if (p.is_dir() and "dir" in kinds) or (p.is_file() and "file" in kinds):
-                    items.append(p)
-                if p.is_dir():
-                    for q in list(p.iterdir()):
-                        if (q.is_dir() and "dir" in kinds) or (q.is_file() and "file" in kinds):
-                            items.append(q)
-        else:
-            # All levels
-            for p in base.rglob("*"):
-                if (p.is_dir() and "dir" in kinds) or (p.is_file() and "file" in kinds):
-                    items.append(p)
-        return items
+        # Lazy: entries flow into planning as the walk discovers them
+        return _scandir_walk(base, depth, self.include_dirs.get(), self.include_files.get())
 
     def _transform_name(self, name: str) -> str:
-        s = name
-        if self.replace_space.get():
-            s = replace_space_with_underscore(s)
-        if REMOVE_ACCENTS:
-            s = strip_accents(s)
-        if TRANSFORM_TO_UPPER:
-            s = to_upper(s)
-        return s
+        return self._transform(name)
 
-    def _plan_for_path(self, p: Path) -> tuple[Path, Path]:
-        new_name = self._transform_name(p.name.replace('-', '_'))
-        new_path = p.with_name(new_name)
-        if new_path == p:
+    def _plan_for_path(self, p: str, new_name: str | None = None) -> tuple[str, str]:
+        head, name = os.path.split(p)
+        if new_name is None:
+            new_name = self._transform_name(name)
+        if new_name == name:
             return p, p
-        # handle collision quickly for plan only
-        if new_path.exists():
-            if self.collision_mode == COL_SUFFIX:
-                i = 1
-                while True:
-                    cand = new_path.with_name(f"{new_path.stem}_{i}{new_path.suffix}")
-                    if not cand.exists():
-                        new_path = cand
-                        break
-                    i += 1
-            else:
-                # merge target — plan marks as same path (special status during preview)
-                pass
+        new_path = os.path.join(head, new_name)
+        # handle collision quickly for plan only (one listing per parent);
+        # a case-only change collides with nothing but itself
+        if self.collision_mode == COL_SUFFIX and name_key(new_path) != name_key(p):
+            new_path = free_name(new_path, self._plan_names_in(head))
+        # merge target — plan keeps the path (special status during preview)
         return p, new_path
 
+    def _plan_names_in(self, folder: str) -> set[str]:
+        names = self._plan_names.get(folder)
+        if names is None:
+            names = self._plan_names[folder] = dir_names(folder)
+        return names
+
     def _preview(self):
+        if self._busy:
+            return
         if not self.base_dirs:
             messagebox.showinfo("Preview", "Add at least one base folder.")
             return
         self.tree.delete(*self.tree.get_children())
         self.preview_rows.clear()
-        total = 0
-        for base in self.base_dirs:
-            for p in self._collect_targets(base):
-                src, dst = self._plan_for_path(p)
-                kind = kind_of(p)
-                tag = "preview"
-                status = "same" if src == dst else ("merge" if self.collision_mode == COL_MERGE_HASH and dst.exists() else "rename")
-                self.tree.insert("", "end", values=(str(base), kind, str(src), str(dst), status), tags=(tag,))
-                self.preview_rows.append((base, src, dst))
-                total += 1
-        self.progress_msg.set(f"Preview: {total} items")
+        self._plan_names = {}
+        self._replace_space = self.replace_space.get()
+        # Memoized per Preview: trees repeat basenames (src, README.md, …) a lot
+        self._transform = functools.lru_cache(maxsize=65536)(make_name_transform(self._replace_space))
+        self._cancel_preview.clear()
+        self._set_busy(True)
+        self.progress_msg.set("Scanning…")
+        # Bounded: the scanner blocks when the tree falls behind
+        q = queue.Queue(maxsize=PREVIEW_QUEUE_MAX)
+        t = threading.Thread(target=self._preview_worker, args=(list(self.base_dirs), q), daemon=True)
+        t.start()
+        self.after(PROGRESS_TICK_MS, self._drain_preview, q)
+
+    def _plan_base(self, base: Path, q: queue.Queue):
+        # Walk + plan one base root on the preview pool, batches straight to q
+        self._progress_update(msg="Scanning…", current_folder=str(base))
+        base_s = str(base)
+        transform = self._transform
+        # a name that is ASCII, upper-case and free of '-' (and ' ' when replaced)
+        # is already canonical under every flag combination, so skip the transform
+        blank = " " if self._replace_space else "-"
+        targets = self._collect_targets(base)
+        while not self._cancel_preview.is_set():
+            chunk = list(islice(targets, PREVIEW_BATCH))
+            if not chunk:
+                break
+            # One translate per name in a tight comprehension, then plan each path
+            names = [os.path.basename(p) for p, _ in chunk]
+            new_names = [n if n.isascii() and n.isupper() and "-" not in n and blank not in n else transform(n)
+                         for n in names]
+            q.put(list(self._plan_rows(base_s, chunk, new_names)))
+
+    def _plan_rows(self, base_s: str, chunk, new_names):
+        for (p, kind), new_name in zip(chunk, new_names):
+            src, dst = self._plan_for_path(p, new_name)
+            if src == dst:
+                status = "same"
+            elif (self.collision_mode == COL_MERGE_HASH
+                  and name_key(dst) != name_key(src)
+                  and name_key(dst) in self._plan_names_in(os.path.dirname(dst))):
+                status = "merge"
+            else:
+                status = "rename"
+            yield base_s, kind, src, dst, status
+
+    def _preview_worker(self, bases: list[Path], q: queue.Queue):
+        # Bases are walked concurrently so roots on different devices overlap
+        # their I/O; every base streams its batches to the tree, None ends
+        try:
+            with ThreadPoolExecutor(max_workers=min(len(bases), PREVIEW_WORKERS)) as pool:
+                futures = [pool.submit(self._plan_base, base, q) for base in bases]
+                for fut in as_completed(futures):
+                    fut.result()
+        finally:
+            q.put(None)
+
+    def _drain_preview(self, q: queue.Queue):
+        # Tk-side consumer, polled every PROGRESS_TICK_MS
+        while True:
+            try:
+                batch = q.get_nowait()
+            except queue.Empty:
+                self.after(PROGRESS_TICK_MS, self._drain_preview, q)
+                return
+            if batch is None:
+                self._finish_preview()
+                return
+            self._insert_preview_rows(batch)
+
+    def _insert_preview_rows(self, batch):
+        # iid is the row's index in preview_rows, so the worker can tag it back
+        for row in batch:
+            self.tree.insert("", "end", iid=str(len(self.preview_rows)), values=row, tags=("preview",))
+            self.preview_rows.append(row)
+
+    def _finish_preview(self):
+        self._apply_pending_progress()
+        self._set_busy(False)
+        total = len(self.preview_rows)
+        if self._cancel_preview.is_set():
+            self.progress_msg.set(f"Preview cancelled: {total} items")
+        else:
+            self.progress_msg.set(f"Preview: {total} items")
+        self.current_folder_var.set("-")
+
+    def _apply_op(self, kind: str, cur: str, new: str, status: str, undo_log: list, taken: set[str],
+                  dir_fd: int | None = None) -> str:
+        # Execute one planned row; returns the tree tag for it.
+        # taken holds the parent's current names and is kept in step with each move;
+        # with dir_fd (an open fd of the parent) a plain rename resolves one component.
+        def _moved(dst: str | None):
+            taken.discard(name_key(cur))
+            if dst is not None:
+                taken.add(name_key(dst))
+
+        if status == "same":
+            return "info"
+        if status == "merge" and self.collision_mode == COL_MERGE_HASH and name_key(new) in taken:
+            # merge dirs/files; cur's kind comes from the scan, new costs one stat
+            new_kind = kind_of(new)
+            if kind == "DIR" and new_kind == "DIR":
+                merge_dirs(Path(cur), Path(new))
+                if not os.path.lexists(cur):
+                    _moved(None)
+                return "merge"
+            if kind == "FILE" and new_kind == "FILE":
+                try:
+                    links = same_file_links(cur, new)
+                    if links == 1:
+                        # same entry under another spelling (case-insensitive FS)
+                        os.rename(cur, new)
+                        _moved(new)
+                        undo_log.append((new, cur))
+                        return "renamed"
+                    if links > 1 or files_identical(Path(cur), Path(new)):
+                        os.unlink(cur)
+                        _moved(None)
+                        return "dupdel"
+                    # keep both by suffix
+                    cand = free_name(new, taken)
+                    os.rename(cur, cand)
+                    _moved(cand)
+                    undo_log.append((cand, cur))
+                    return "renamed"
+                except Exception:
+                    return "conflict"
+            # different kinds — fallback to suffix move
+            cand = free_name(new, taken)
+            try:
+                os.rename(cur, cand)
+                _moved(cand)
+                undo_log.append((cand, cur))
+                return "renamed"
+            except Exception:
+                return "error"
+        # simple rename/move (safe suffix if needed; a case-only change is no collision)
+        if name_key(new) != name_key(cur):
+            new = free_name(new, taken)
+        try:
+            if dir_fd is None:
+                os.rename(cur, new)
+            else:
+                os.rename(os.path.basename(cur), os.path.basename(new), src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
+            _moved(new)
+            undo_log.append((new, cur))
+            return "renamed"
+        except Exception:
+            return "error"
+
+    def _rename_group(self, rows):
+        # All rows share one parent folder, so they run in order on one thread
+        undo_log = []
+        tags = []
+        parent = os.path.dirname(rows[0][2])
+        self._progress_update(current_folder=parent)
+        taken = dir_names(parent)
+        dir_fd = None
+        if DIR_FD_RENAME:
+            try:
+                dir_fd = os.open(parent, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+            except OSError:
+                pass
+        try:
+            for idx, kind, cur, new, status in rows:
+                tags.append((str(idx), self._apply_op(kind, cur, new, status, undo_log, taken, dir_fd)))
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+        return undo_log, tags
 
     def _rename_worker(self):
         # Execute renames/merges
-        ops = self.tree.get_children()
+        # Plan comes from preview_rows; the tree is display only
+        ops = list(self.preview_rows)
         total = len(ops)
         self._progress_start(total)
         done = 0
         undo_log = []  # list of (dst, original_path)
+        clear_hash_cache()
+        # Row tags are handed to the Tk thread in batches; Tk isn't thread-safe
+        tags_out = []
+        last_post = time.monotonic()
+
+        def _post_tags(force: bool = False):
+            nonlocal tags_out, last_post
+            now = time.monotonic()
+            if tags_out and (force or len(tags_out) >= TAG_BATCH or now - last_post >= PROGRESS_TICK_MS / 1000):
+                self.after(0, self._apply_tags, tags_out)
+                tags_out = []
+                last_post = now
+
         try:
-            for iid in ops:
-                base, kind, cur_s, new_s, status = self.tree.item(iid, "values")
-                cur = Path(cur_s)
-                new = Path(new_s)
-                self._progress_update(done, current_folder=str(cur.parent))
-                if status == "same":
-                    self.tree.item(iid, tags=("info",))
-                elif status == "merge" and self.collision_mode == COL_MERGE_HASH and new.exists():
-                    # merge dirs/files
-                    if cur.is_dir() and new.is_dir():
-                        stats = merge_dirs(cur, new)
-                        self.tree.item(iid, tags=("merge",))
-                    elif cur.is_file() and new.is_file():
-                        try:
-                            if sha256_file(cur) == sha256_file(new):
-                                cur.unlink()
-                                self.tree.item(iid, tags=("dupdel",))
-                            else:
-                                # keep both by suffix
-                                i = 1
-                                cand = new
-                                while cand.exists():
-                                    cand = new.with_name(f"{new.stem}_{i}{new.suffix}")
-                                    i += 1
-                                cur.rename(cand)
-                                undo_log.append((cand, cur))
-                                self.tree.item(iid, tags=("renamed",))
-                        except Exception:
-                            self.tree.item(iid, tags=("conflict",))
-                    else:
-                        # different kinds — fallback to suffix move
-                        i = 1
-                        cand = new
-                        while cand.exists():
-                            cand = new.with_name(f"{new.stem}_{i}{new.suffix}")
-                            i += 1
-                        try:
-                            cur.rename(cand)
-                            undo_log.append((cand, cur))
-                            self.tree.item(iid, tags=("renamed",))
-                        except Exception:
-                            self.tree.item(iid, tags=("error",))
-                else:
-                    # simple rename/move (safe suffix if needed)
-                    if new.exists():
-                        i = 1
-                        cand = new
-                        while cand.exists():
-                            cand = new.with_name(f"{new.stem}_{i}{new.suffix}")
-                            i += 1
-                        new = cand
-                    try:
-                        cur.rename(new)
-                        undo_log.append((new, cur))
-                        self.tree.item(iid, tags=("renamed",))
-                    except Exception:
-                        self.tree.item(iid, tags=("error",))
-                done += 1
-                self._progress_update(done)
+            if self.collision_mode == COL_MERGE_HASH:
+                # merges touch other rows' targets: keep plan order, one at a time
+                taken_by_dir: dict[str, set[str]] = {}
+                for idx, (base, kind, cur, new, status) in enumerate(ops):
+                    parent = os.path.dirname(cur)
+                    self._progress_update(done, current_folder=parent)
+                    taken = taken_by_dir.get(parent)
+                    if taken is None:
+                        taken = taken_by_dir[parent] = dir_names(parent)
+                    tags_out.append((str(idx), self._apply_op(kind, cur, new, status, undo_log, taken)))
+                    _post_tags()
+                    done += 1
+                    self._progress_update(done)
+            else:
+                # Folders are independent: one task per parent folder, deepest
+                # folders first so nothing moves before its children are done
+                groups: dict[str, list] = {}
+                for idx, (base, kind, cur, new, status) in enumerate(ops):
+                    groups.setdefault(os.path.dirname(cur), []).append((idx, kind, cur, new, status))
+                by_depth: dict[int, list] = {}
+                for parent, rows in groups.items():
+                    by_depth.setdefault(parent.count(os.sep), []).append(rows)
+                with ThreadPoolExecutor(max_workers=RENAME_WORKERS) as pool:
+                    for depth in sorted(by_depth, reverse=True):
+                        for part, tags in pool.map(self._rename_group, by_depth[depth]):
+                            undo_log.extend(part)
+                            tags_out.extend(tags)
+                            _post_tags()
+                            done += len(tags)
+                            self._progress_update(done)
         finally:
+            _post_tags(force=True)
             self._progress_finish("Rename finished.")
             self._undo_stack = undo_log
+            self.after(0, self._set_busy, False)
+
+    def _apply_tags(self, batch):
+        for iid, tag in batch:
+            self.tree.item(iid, tags=(tag,))
 
     def _rename(self):
+        # F9 bypasses the disabled button: ignore it while Preview streams
+        # (preview_rows is still partial) or a rename is already running
+        if self._busy:
+            return
         if not self.base_dirs:
             messagebox.showinfo("Rename", "Add at least one base folder.")
             return
+        self._set_busy(True)
         t = threading.Thread(target=self._rename_worker, daemon=True)
         t.start()
 
+    def _undo_group(self, entries) -> int:
+        # One parent folder, undone in reverse of the order it was renamed
+        errors = 0
+        for dst, original in reversed(entries):
+            try:
+                os.rename(dst, original)
+            except FileNotFoundError:
+                pass  # already moved away; nothing to undo
+            except Exception:
+                errors += 1
+        return errors
+
     def _undo_last(self):
+        if self._busy:
+            return
         log = getattr(self, "_undo_stack", [])
         if not log:
             messagebox.showinfo("Undo", "Nothing to undo.")
             return
+        groups: dict[str, list] = {}
+        for dst, original in log:
+            groups.setdefault(os.path.dirname(original), []).append((dst, original))
+        by_depth: dict[int, list] = {}
+        for parent, entries in groups.items():
+            by_depth.setdefault(parent.count(os.sep), []).append(entries)
         errors = 0
-        for dst, original in reversed(log):
-            try:
-                if dst.exists():
-                    dst.rename(original)
-            except Exception:
-                errors += 1
+        # Mirror of the rename waves: shallow folders first, because deeper
+        # entries were logged under their parents' original names
+        with ThreadPoolExecutor(max_workers=RENAME_WORKERS) as pool:
+            for depth in sorted(by_depth):
+                errors += sum(pool.map(self._undo_group, by_depth[depth]))
         self._undo_stack = []
         if errors:
             messagebox.showwarning("Undo", f"Undo finished with {errors} error(s).")
@@ -939,7 +1421,9 @@ class App(ttk.Frame):
             messagebox.showinfo("Undo", "Undo finished.")
 
     def _save_csv(self):
-        if not self.tree.get_children():
+        import csv
+        from tkinter import filedialog
+        if not self.preview_rows:
             messagebox.showinfo("Save CSV", "No rows to export. Run Preview first.")
             return
         try:
@@ -948,11 +1432,12 @@ class App(ttk.Frame):
                                                 filetypes=[["CSV", "*.csv"], ["All", "*.*"]])
             if not path:
                 return
-            with open(path, "w", newline="", encoding="utf-8") as f:
+            # Rows come straight from preview_rows (same columns as the tree);
+            # 1 MiB buffer: far fewer write() calls than the 8 KiB default
+            with open(path, "w", newline="", encoding="utf-8", buffering=1024 * 1024) as f:
                 w = csv.writer(f)
                 w.writerow(["Base", "Kind", "Current", "New", "Status"])
-                for iid in self.tree.get_children():
-                    w.writerow(list(self.tree.item(iid, "values")))
+                w.writerows(self.preview_rows)
             messagebox.showinfo("Save CSV", f"Saved: {path}")
         except Exception as e:
             messagebox.showerror("Save CSV", f"Failed: {e}")
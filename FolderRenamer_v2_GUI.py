@@ -65,15 +65,34 @@ def apply_pharmapp_theme(root: tk.Tk):
               background=[("active", head_bg), ("pressed", head_bg)])
 
 # --------- Name transform helpers ----------
+def _build_accent_map() -> dict[int, str]:
+    # Precomposed Latin letters (all Vietnamese vowels included) -> base letter
+    table = {ord("đ"): "d", ord("Đ"): "D"}
+    for cp in [*range(0xC0, 0x250), *range(0x1E00, 0x1F00)]:
+        base = "".join(ch for ch in unicodedata.normalize("NFD", chr(cp)) if not unicodedata.combining(ch))
+        if base != chr(cp):
+            table[cp] = base
+    return table
+
+_ACCENT_MAP = _build_accent_map()
+# '-' -> '_', accents dropped and UPPER folded into one table
+_NAME_MAP = {cp: base.upper() for cp, base in _ACCENT_MAP.items()}
+_NAME_MAP.update({ord(c): c.upper() for c in "abcdefghijklmnopqrstuvwxyz"})
+_NAME_MAP[ord("-")] = "_"
+
 def remove_vietnamese_diacritics(s: str) -> str:
-    s = s.replace("đ", "d").replace("Đ", "D")
+    # Table lookup for precomposed letters; NFD only for what is left
+    s = s.translate(_ACCENT_MAP)
+    if s.isascii():
+        return s
     nfkd = unicodedata.normalize("NFD", s)
     return "".join(ch for ch in nfkd if not unicodedata.combining(ch))
 
 def transform_folder_name(name: str) -> str:
-    s = name.replace("-", "_")
-    s = remove_vietnamese_diacritics(s)
-    s = s.upper()
+    # '-' -> '_', remove diacritics, UPPER in one C-level pass
+    s = name.translate(_NAME_MAP)
+    if not s.isascii():
+        s = remove_vietnamese_diacritics(s).upper()
     return s
 
 def unique_target_path(target: Path) -> Path:
@@ -94,9 +113,13 @@ DEPTH_LEVEL2_ONLY = "LEVEL2_ONLY"
 DEPTH_UP_TO_LEVEL2 = "UP_TO_LEVEL2"
 DEPTH_ALL = "ALL"
 
-def _rel_depth(base: Path, p: Path) -> int:
-    # Number of components from base to p
-    return len(p.relative_to(base).parts)
+# (min, max) level relative to base; None = no cap
+_DEPTH_RANGE = {
+    DEPTH_LEVEL1_ONLY: (1, 1),
+    DEPTH_LEVEL2_ONLY: (2, 2),
+    DEPTH_UP_TO_LEVEL2: (1, 2),
+    DEPTH_ALL: (1, None),
+}
 
 def collect_folders_by_depth(base_dir: Path, depth_mode: str) -> list[Path]:
     """
@@ -107,30 +130,31 @@ def collect_folders_by_depth(base_dir: Path, depth_mode: str) -> list[Path]:
     - ALL: depth >= 1
     Results are sorted deepest-first to avoid parent-before-child renames.
     """
-    if not base_dir.exists() or not base_dir.is_dir():
+    if not base_dir.is_dir():
         return []
-
-    all_dirs = [p for p in base_dir.rglob("*") if p.is_dir()]
-    filtered = []
-    for p in all_dirs:
+    lo, hi = _DEPTH_RANGE.get(depth_mode, (1, None))
+
+    # Iterative scandir walk: the level is tracked on the stack and
+    # folders below the cap are never opened.
+    found = []
+    stack = [(str(base_dir), 1)]
+    while stack:
+        path, d = stack.pop()
         try:
-            d = _rel_depth(base_dir, p)
-        except ValueError:
-            # Not under base_dir (shouldn't happen with rglob), skip
-            continue
-        if d < 1:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    if d >= lo:
+                        found.append((d, entry.path))
+                    if hi is None or d < hi:
+                        stack.append((entry.path, d + 1))
+        except OSError:
             continue
-        if depth_mode == DEPTH_LEVEL1_ONLY and d == 1:
-            filtered.append(p)
-        elif depth_mode == DEPTH_LEVEL2_ONLY and d == 2:
-            filtered.append(p)
-        elif depth_mode == DEPTH_UP_TO_LEVEL2 and d in (1, 2):
-            filtered.append(p)
-        elif depth_mode == DEPTH_ALL:
-            filtered.append(p)
 
     # Deepest first
-    return sorted(filtered, key=lambda p: len(p.parts), reverse=True)
+    found.sort(key=lambda t: t[0], reverse=True)
+    return [Path(p) for _, p in found]
 
 def compute_plan(base_dir: Path, folders: list[Path]) -> list[tuple[Path, Path]]:
     plan = []
@@ -5,7 +5,7 @@ FolderRenamer_GUI.py (Files/Folders + Space->Underscore options)
 Rules:
 - '-' -> '_'
 - (Optional) ' ' -> '_'
-- Remove Vietnamese diacritics (đ/Đ -> D)
+- Remove Vietnamese diacritics (đ/Đ -> D), or keep them NFKC-canonicalized
 - Uppercase all letters
 
 New:
@@ -19,8 +19,14 @@ Features:
 - Undo last batch (this session)
 - Save mapping to CSV
 """
+import os
 import csv
+import re
+import functools
 import unicodedata
+from collections import Counter
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
@@ -67,30 +73,121 @@ def apply_pharmapp_theme(root: tk.Tk):
               background=[("active", head_bg), ("pressed", head_bg)])
 
 # --------- Name transform helpers ----------
-def remove_vietnamese_diacritics(s: str) -> str:
-    s = s.replace("đ", "d").replace("Đ", "D")
-    nfkd = unicodedata.normalize("NFD", s)
-    return "".join(ch for ch in nfkd if not unicodedata.combining(ch))
+def _build_accent_map() -> dict[int, str]:
+    # Precomposed Latin letters (all Vietnamese vowels included) -> base letter
+    table = {ord("đ"): "d", ord("Đ"): "D"}
+    for cp in [*range(0xC0, 0x250), *range(0x1E00, 0x1F00)]:
+        base = "".join(ch for ch in unicodedata.normalize("NFD", chr(cp)) if not unicodedata.combining(ch))
+        if base != chr(cp):
+            table[cp] = base
+    return table
+
+def _build_combining_re() -> re.Pattern:
+    # Every code point unicodedata.combining() flags (all lie in planes 0-1),
+    # as one character class of ranges, so the filter is exact but runs in C
+    ranges: list[list[int]] = []
+    for cp in range(0x20000):
+        if unicodedata.combining(chr(cp)):
+            if ranges and ranges[-1][1] == cp - 1:
+                ranges[-1][1] = cp
+            else:
+                ranges.append([cp, cp])
+    return re.compile("[" + "".join(f"{chr(a)}-{chr(b)}" for a, b in ranges) + "]")
+
+_ACCENT_MAP = _build_accent_map()
+# Stripped after NFD in a single C pass
+_COMBINING_RE = _build_combining_re()
 
-def transform_name(name: str, replace_space: bool) -> str:
+def remove_vietnamese_diacritics(s: str) -> str:
+    # Table lookup for precomposed letters; NFD only for what is left
+    s = s.translate(_ACCENT_MAP)
+    if s.isascii():
+        return s
+    return _COMBINING_RE.sub("", unicodedata.normalize("NFD", s))
+
+# --------- Accent options ----------
+ACCENT_STRIP = "STRIP"  # NFD + drop combining marks: "Dữ liệu" -> "DU LIEU"
+ACCENT_NFKC = "NFKC"    # keep accents, one canonical form: "Dữ liệu" -> "DỮ LIỆU"
+
+def _fold_accents(s: str, accent_mode: str) -> str:
+    if accent_mode == ACCENT_NFKC:
+        return unicodedata.normalize("NFKC", s)
+    return remove_vietnamese_diacritics(s)
+
+@functools.lru_cache(maxsize=65536)
+def transform_name(name: str, replace_space: bool, accent_mode: str = ACCENT_STRIP) -> str:
+    # Memoized: the same basenames recur all over a tree
+    if name.isascii() and name.isupper() and "-" not in name and not (replace_space and " " in name):
+        return name  # already in target form
     s = name.replace("-", "_")
     if replace_space:
         s = s.replace(" ", "_")
-    s = remove_vietnamese_diacritics(s)
+    s = _fold_accents(s, accent_mode)
     s = s.upper()
     return s
 
-def unique_target_path(target: Path) -> Path:
-    if not target.exists():
-        return target
-    stem = target.name
-    base = target.parent
-    i = 1
-    while True:
-        candidate = base / f"{stem}_{i}"
-        if not candidate.exists():
-            return candidate
-        i += 1
+# Below this many names the per-name (memoized) path is cheaper
+BATCH_TRANSFORM_MIN = 256
+
+def transform_names(names: list[str], replace_space: bool,
+                    accent_mode: str = ACCENT_STRIP) -> list[str]:
+    """transform_name over a whole list: names are joined with NUL (never valid
+    in a filename) so each rule runs once, in C, over one big string."""
+    if len(names) < BATCH_TRANSFORM_MIN:
+        return [transform_name(n, replace_space, accent_mode) for n in names]
+    s = "\0".join(names).replace("-", "_")
+    if replace_space:
+        s = s.replace(" ", "_")
+    s = _fold_accents(s, accent_mode)
+    return s.upper().split("\0")
+
+def unique_target_path(target: str, taken: set[str] | None = None, fold=None,
+                       next_index: dict[str, int] | None = None) -> str:
+    # With `taken` (names already in target's folder, passed through `fold`
+    # on case-insensitive filesystems) probes are set lookups and the chosen
+    # name is added to it; without it, ask the filesystem. `next_index`
+    # remembers per stem where numbering left off, so a folder full of
+    # FOO_1 … FOO_50 is probed once per batch, not once per colliding rename.
+    folder, _, stem = target.rpartition(os.sep)
+    if taken is None:
+        exists = lambda name: os.path.lexists(folder + os.sep + name)
+    elif fold is not None:
+        exists = lambda name: fold(name) in taken
+    else:
+        exists = taken.__contains__
+    name = stem
+    if exists(name):
+        i = next_index.get(stem, 1) if next_index is not None else 1
+        name = f"{stem}_{i}"
+        while exists(name):
+            i += 1
+            name = f"{stem}_{i}"
+        if next_index is not None:
+            next_index[stem] = i + 1
+    if taken is not None:
+        taken.add(fold(name) if fold else name)
+    return folder + os.sep + name
+
+def is_case_insensitive(folder: str, names) -> bool:
+    # Probe one of the folder's own entries: its case-swapped name reaching
+    # the same object means the filesystem folds case (Windows, default
+    # macOS); missing or another object means it does not. Nothing to probe
+    # -> fold anyway, which can only add a suffix, never allow an overwrite.
+    for name in names:
+        swapped = name.swapcase()
+        if swapped == name or not name.isascii():
+            continue
+        try:
+            st = os.lstat(folder + os.sep + name)
+        except OSError:
+            continue
+        try:
+            return os.path.samestat(st, os.lstat(folder + os.sep + swapped))
+        except FileNotFoundError:
+            return False
+        except OSError:
+            continue
+    return True
 
 # --------- Depth options ----------
 DEPTH_LEVEL1_ONLY = "LEVEL1_ONLY"
@@ -98,36 +195,51 @@ DEPTH_LEVEL2_ONLY = "LEVEL2_ONLY"
 DEPTH_UP_TO_LEVEL2 = "UP_TO_LEVEL2"
 DEPTH_ALL = "ALL"
 
-def _rel_depth(base: Path, p: Path) -> int:
-    return len(p.relative_to(base).parts)
+# Deepest level each mode can select; the walk never opens folders below it
+_MAX_DEPTH = {
+    DEPTH_LEVEL1_ONLY: 1,
+    DEPTH_LEVEL2_ONLY: 2,
+    DEPTH_UP_TO_LEVEL2: 2,
+}
+
+def _walk(dir_path: str, depth: int, max_depth: int | None = None):
+    # scandir recursion: plain (path, kind, depth) tuples, kind taken from the
+    # entry's cached type, so nothing is stat'ed or wrapped in Path here.
+    # Each listing is read up front so deep trees don't hold one open fd per level,
+    # and a folder's entries are all yielded before any subfolder's.
+    try:
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+    except OSError:
+        return
+    subdirs = []
+    for e in entries:
+        kind = "DIR" if e.is_dir() else "FILE" if e.is_file() else "OTHER"
+        yield e.path, kind, depth
+        if (max_depth is None or depth < max_depth) and e.is_dir(follow_symlinks=False):
+            subdirs.append(e.path)
+    for sub in subdirs:
+        yield from _walk(sub, depth + 1, max_depth)
 
 def collect_paths_by_depth(base_dir: Path, depth_mode: str,
-                           include_dirs: bool, include_files: bool) -> list[Path]:
+                           include_dirs: bool, include_files: bool):
     """
-    Returns selected paths under base_dir filtered by depth:
+    Yields selected (path, kind) pairs under base_dir filtered by depth:
     - LEVEL1_ONLY: depth == 1
     - LEVEL2_ONLY: depth == 2
     - UP_TO_LEVEL2: depth in {1, 2}
     - ALL: depth >= 1
     Also filters by kind: dirs/files.
-    Sorted deepest-first so children (files/subdirs) rename before parents.
+    Lazily, in walk order, each folder's entries together; apply_renames
+    does the deepest-first ordering itself.
     """
     if not base_dir.exists() or not base_dir.is_dir():
-        return []
-    # rglob("*") includes both files and dirs
-    all_paths = list(base_dir.rglob("*"))
-    filtered = []
-    for p in all_paths:
-        try:
-            d = _rel_depth(base_dir, p)
-        except ValueError:
-            continue
-        if d < 1:
-            continue
+        return
+    for path, kind, d in _walk(str(base_dir), 1, _MAX_DEPTH.get(depth_mode)):
         # Kind filter
-        if p.is_dir() and not include_dirs:
+        if kind == "DIR" and not include_dirs:
             continue
-        if p.is_file() and not include_files:
+        if kind == "FILE" and not include_files:
             continue
         # Depth filter
         if depth_mode == DEPTH_LEVEL1_ONLY and d != 1:
@@ -137,50 +249,109 @@ def collect_paths_by_depth(base_dir: Path, depth_mode: str,
         if depth_mode == DEPTH_UP_TO_LEVEL2 and d not in (1, 2):
             continue
         # DEPTH_ALL: accept all with d>=1
-        filtered.append(p)
-
-    # Deepest-first
-    return sorted(filtered, key=lambda p: len(p.parts), reverse=True)
-
-def compute_plan(paths: list[Path], replace_space: bool) -> list[tuple[Path, Path]]:
+        yield path, kind
+
+def compute_plan(entries: list[tuple[str, str]], replace_space: bool,
+                 accent_mode: str = ACCENT_STRIP) -> list[tuple[str, str, str, str, str]]:
+    # Rows are (old, new, sort_key, kind, status), paths as plain strings: the
+    # new path is the old folder + new name, with no Path parsing. The display
+    # sort key is built once here and the kind comes from the walk, so nothing
+    # is stat'ed again. Status is COLLISION when another entry in the same
+    # folder ends up with the same name (compared casefolded where that
+    # folder's filesystem ignores case, probed once per folder).
     plan = []
-    for p in paths:
-        new_name = transform_name(p.name, replace_space)
-        if new_name != p.name:
-            plan.append((p, p.with_name(new_name)))
+    split = [s.rpartition(os.sep) for s, _ in entries]
+    new_names = transform_names([name for _, _, name in split], replace_space, accent_mode)
+    names_by_folder: dict[str, list[str]] = {}
+    for folder, _, name in split:
+        names_by_folder.setdefault(folder, []).append(name)
+    folds = {folder: str.casefold if is_case_insensitive(folder, names) else None
+             for folder, names in names_by_folder.items()}
+    keys = [(folder, folds[folder](n) if folds[folder] else n)
+            for (folder, _, _), n in zip(split, new_names)]
+    taken = Counter(keys)
+    for (s, kind), (folder, _, name), new_name, key in zip(entries, split, new_names, keys):
+        if new_name != name:
+            status = "COLLISION" if taken[key] > 1 else "Preview"
+            plan.append((s, folder + os.sep + new_name, s.casefold(), kind, status))
     return plan
 
-def apply_renames(plan: list[tuple[Path, Path]]) -> list[tuple[Path, Path, Path]]:
-    applied = []
-    for old, intended_new in plan:
+def _path_depth(p: str) -> int:
+    # Separator count: one C-level scan instead of building Path.parts
+    return p.count(os.sep)
+
+# Renames are syscall-bound (the GIL is released), so threads overlap them
+RENAME_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+def _rename_in_folder(rows: list[tuple[int, str, str, str]]) -> list[tuple[int, tuple]]:
+    # All rows share one parent: one listing, kept current as the rows rename
+    # into it, and no other task touches that folder's names. Casefolded
+    # where this folder's filesystem ignores case, like exists() would.
+    folder = os.path.dirname(rows[0][1])
+    try:
+        listing = os.listdir(folder)
+    except OSError:
+        listing = []
+    names = set(listing)
+    fold = str.casefold if is_case_insensitive(folder, listing) else None
+    if fold is not None:
+        names = {fold(n) for n in names}
+    else:
+        fold = lambda n: n
+    depth = _path_depth(folder) + 1
+    next_index: dict[str, int] = {}
+    done = []
+    for i, old, intended_new, kind in rows:
         try:
-            actual_target = intended_new if not intended_new.exists() else unique_target_path(intended_new)
-            old.rename(actual_target)
-            applied.append((old, intended_new, actual_target))
+            old_name = os.path.basename(old)
+            if fold(old_name) == fold(os.path.basename(intended_new)):
+                actual_target = intended_new  # case-only change of the same entry
+            else:
+                actual_target = unique_target_path(intended_new, names, fold, next_index)
+            os.rename(old, actual_target)
+            names.discard(fold(old_name))
+            names.add(fold(os.path.basename(actual_target)))
+            # Each applied row carries its depth so undo can sort on an int
+            done.append((i, (old, intended_new, actual_target, depth, kind)))
         except Exception as e:
             print(f"[ERROR] Failed to rename '{old}' -> '{intended_new}': {e}")
-    return applied
+    return done
 
-def undo_renames(applied: list[tuple[Path, Path, Path]]) -> list[tuple[Path, Path]]:
+def apply_renames(plan: list[tuple[str, str, str, str, str]],
+                  parallel: bool = False) -> list[tuple[str, str, str, int, str]]:
+    # Deepest level first, so no folder moves while its contents are pending;
+    # within a level every parent folder is one task.
+    if not plan:
+        return []
+    waves: dict[int, dict[str, list]] = {}
+    for i, (old, intended_new, _key, kind, _status) in enumerate(plan):
+        folder = os.path.dirname(old)
+        waves.setdefault(_path_depth(old), {}).setdefault(folder, []).append((i, old, intended_new, kind))
+    done = []
+    # One worker keeps the serial behaviour for slow/network filesystems
+    with ThreadPoolExecutor(max_workers=RENAME_WORKERS if parallel else 1) as pool:
+        for depth in sorted(waves, reverse=True):
+            for rows in pool.map(_rename_in_folder, waves[depth].values()):
+                done.extend(rows)
+    done.sort(key=itemgetter(0))
+    return [row for _, row in done]
+
+def undo_renames(applied: list[tuple[str, str, str, int, str]]) -> list[tuple[str, str, str]]:
     undone = []
     # Shallow-first when undoing (rename parents earlier to restore tree paths)
-    for old, intended, actual in sorted(applied, key=lambda t: len(t[2].parts)):
+    for old, intended, actual, _depth, kind in sorted(applied, key=itemgetter(3)):
         try:
-            back_target = old if not old.exists() else unique_target_path(old)
-            actual.rename(back_target)
-            undone.append((actual, back_target))
+            back_target = unique_target_path(old)
+            os.rename(actual, back_target)
+            undone.append((actual, back_target, kind))
         except Exception as e:
             print(f"[ERROR] Undo failed '{actual}' -> '{old}': {e}")
     return undone
 
-def _kind_of(p: Path) -> str:
-    if p.is_dir():
-        return "DIR"
-    if p.is_file():
-        return "FILE"
-    return "OTHER"
-
 # --------- GUI ----------
+INSERT_CHUNK = 500  # Treeview rows per idle callback
+PREVIEW_CHUNK = 500  # walked entries planned per idle callback
+
 class App(ttk.Frame):
     def __init__(self, master):
         super().__init__(master)
@@ -192,9 +363,13 @@ class App(ttk.Frame):
         self.include_dirs = tk.BooleanVar(value=True)   # default: folders
         self.include_files = tk.BooleanVar(value=False) # default: not files
         self.replace_space = tk.BooleanVar(value=True)  # default: replace space -> underscore
+        self.accent_mode = tk.StringVar(value=ACCENT_STRIP)
+        self.parallel_rename = tk.BooleanVar(value=True) # off for slow/network drives
 
-        self.preview_rows: list[tuple[Path, Path]] = []
-        self.applied_rows: list[tuple[Path, Path, Path]] = []
+        self.preview_rows: list[tuple[str, str, str, str, str]] = []
+        self.applied_rows: list[tuple[str, str, str, int, str]] = []
+        self._fill_job = None
+        self._preview_job = None
 
         self._build_ui()
 
@@ -224,15 +399,24 @@ class App(ttk.Frame):
 
         # Transform options
         tx_frame = ttk.LabelFrame(self, text="Transform / Quy tắc đổi tên"); tx_frame.pack(fill="x", padx=10, pady=(6,0))
-        ttk.Label(tx_frame, text="Always: '-' → '_' • Remove accents • Uppercase").pack(side="left", padx=(6,12))
+        ttk.Label(tx_frame, text="Always: '-' → '_' • Uppercase").pack(side="left", padx=(6,12))
         ttk.Checkbutton(tx_frame, text="Replace space with '_' (Thay khoảng trắng bằng '_')",
                         variable=self.replace_space).pack(side="left")
 
+        # Accent handling
+        accent_frame = ttk.LabelFrame(self, text="Accent handling / Xử lý dấu"); accent_frame.pack(fill="x", padx=10, pady=(6,0))
+        ttk.Radiobutton(accent_frame, text="Strip (Bỏ dấu)", value=ACCENT_STRIP,
+                        variable=self.accent_mode).pack(side="left", padx=(6,12))
+        ttk.Radiobutton(accent_frame, text="Canonicalize, NFKC (Giữ dấu)", value=ACCENT_NFKC,
+                        variable=self.accent_mode).pack(side="left", padx=(0,12))
+
         actions = ttk.Frame(self); actions.pack(fill="x", padx=10, pady=(8,6))
         ttk.Button(actions, text="Preview / Xem trước", style="Pharm.TButton",
                    command=self._preview).pack(side="left")
         ttk.Button(actions, text="Rename / Đổi tên", style="Pharm.TButton",
                    command=self._rename).pack(side="left", padx=(6,0))
+        ttk.Checkbutton(actions, text="Parallel rename",
+                        variable=self.parallel_rename).pack(side="left", padx=(6,0))
         ttk.Button(actions, text="Undo Last / Hoàn tác", style="Pharm.TButton",
                    command=self._undo_last).pack(side="left", padx=(6,0))
         ttk.Button(actions, text="Save CSV Map", style="Pharm.TButton",
@@ -267,8 +451,29 @@ class App(ttk.Frame):
             self.selected_dir.set(d)
 
     def _clear_tree(self):
-        for iid in self.tree.get_children():
-            self.tree.delete(iid)
+        if self._fill_job is not None:
+            self.after_cancel(self._fill_job)
+            self._fill_job = None
+        if self._preview_job is not None:
+            self.after_cancel(self._preview_job)
+            self._preview_job = None
+        self.tree.delete(*self.tree.get_children())
+
+    def _fill_tree(self, rows: list[tuple], start: int = 0):
+        # Chunks inserted from idle callbacks keep the window responsive; the
+        # columns are hidden only while a chunk goes in, so Tk redraws once
+        # per chunk instead of after each insert, and rows show as they land
+        end = start + INSERT_CHUNK
+        self.tree.configure(displaycolumns=())
+        try:
+            for values in rows[start:end]:
+                self.tree.insert("", "end", values=values)
+        finally:
+            self.tree.configure(displaycolumns="#all")
+        if end < len(rows):
+            self._fill_job = self.after_idle(self._fill_tree, rows, end)
+        else:
+            self._fill_job = None
 
     def _preview(self):
         base = Path(self.selected_dir.get().strip())
@@ -280,31 +485,60 @@ class App(ttk.Frame):
             return
 
         self._clear_tree()
-        paths = collect_paths_by_depth(base,
+        self.preview_rows = []
+        entries = collect_paths_by_depth(base,
                                        self.depth_mode.get(),
                                        self.include_dirs.get(),
                                        self.include_files.get())
-        plan = compute_plan(paths, self.replace_space.get())
-        self.preview_rows = plan
-        if not plan:
-            self.tree.insert("", "end", values=("", str(base), "(unchanged)", "No changes"))
+        # Options are fixed at the start so a scan can't mix two settings
+        plan_chunk = functools.partial(compute_plan,
+                                       replace_space=self.replace_space.get(),
+                                       accent_mode=self.accent_mode.get())
+        self._preview_job = self.after_idle(self._preview_step, base, entries, plan_chunk, None)
+
+    def _preview_step(self, base: Path, entries, plan_chunk, pending):
+        # Plan and show one chunk of the walk per idle callback, so rows appear
+        # while scanning. Chunks end on a folder boundary: collision counts
+        # need all of a folder's entries together.
+        chunk = [pending] if pending else []
+        pending = None
+        for item in entries:
+            if (len(chunk) >= PREVIEW_CHUNK
+                    and os.path.dirname(item[0]) != os.path.dirname(chunk[-1][0])):
+                pending = item
+                break
+            chunk.append(item)
+        plan = plan_chunk(chunk)
+        self.preview_rows.extend(plan)
+        for old, new, _key, kind, status in sorted(plan, key=itemgetter(2)):
+            self.tree.insert("", "end", values=(kind, old, new, status))
+        if pending is not None:
+            self._preview_job = self.after_idle(self._preview_step, base, entries,
+                                                plan_chunk, pending)
             return
-        for old, new in sorted(plan, key=lambda t: str(t[0]).lower()):
-            self.tree.insert("", "end", values=(_kind_of(old), str(old), str(new), "Preview"))
+        self._preview_job = None
+        if not self.preview_rows:
+            self.tree.insert("", "end", values=("", str(base), "(unchanged)", "No changes"))
 
     def _rename(self):
+        if self._preview_job is not None:
+            messagebox.showinfo("Info", "Preview is still scanning; try again when it finishes.")
+            return
         if not self.preview_rows:
             if not self._confirm_scan_then_rename():
                 return
-        applied = apply_renames(self.preview_rows)
+        applied = apply_renames(self.preview_rows, self.parallel_rename.get())
         self.applied_rows = applied
         self._clear_tree()
         if not applied:
             self.tree.insert("", "end", values=("", "", "", "Nothing renamed"))
             return
-        for old, intended, actual in sorted(applied, key=lambda t: str(t[0]).lower()):
-            status = "Renamed" if actual == intended else "Renamed (conflict ➜ unique path)"
-            self.tree.insert("", "end", values=(_kind_of(old), str(old), str(actual), status))
+        # Sort the display tuples on their path string
+        rows = [(kind, old, actual,
+                 "Renamed" if actual == intended else "Renamed (conflict ➜ unique path)")
+                for old, intended, actual, _depth, kind in applied]
+        rows.sort(key=lambda v: v[1].casefold())
+        self._fill_tree(rows)
         messagebox.showinfo("Done", f"Renamed {len(applied)} item(s).")
 
     def _confirm_scan_then_rename(self) -> bool:
@@ -315,11 +549,11 @@ class App(ttk.Frame):
         if not self.include_dirs.get() and not self.include_files.get():
             messagebox.showwarning("Warning", "Select at least one target: Folders or Files.")
             return False
-        paths = collect_paths_by_depth(base,
-                                       self.depth_mode.get(),
-                                       self.include_dirs.get(),
-                                       self.include_files.get())
-        plan = compute_plan(paths, self.replace_space.get())
+        entries = list(collect_paths_by_depth(base,
+                                            self.depth_mode.get(),
+                                            self.include_dirs.get(),
+                                            self.include_files.get()))
+        plan = compute_plan(entries, self.replace_space.get(), self.accent_mode.get())
         self.preview_rows = plan
         if not plan:
             messagebox.showinfo("Info", "No items need renaming.")
@@ -334,8 +568,9 @@ class App(ttk.Frame):
         undone = undo_renames(self.applied_rows)
         count = len(undone)
         self._clear_tree()
-        for src, dst in sorted(undone, key=lambda t: str(t[0]).lower()):
-            self.tree.insert("", "end", values=(_kind_of(dst), str(src), str(dst), "Undone"))
+        rows = [(kind, src, dst, "Undone") for src, dst, kind in undone]
+        rows.sort(key=lambda v: v[1].casefold())
+        self._fill_tree(rows)
         self.applied_rows.clear()
         messagebox.showinfo("Undo", f"Undone {count} item(s).")
 
@@ -351,15 +586,15 @@ class App(ttk.Frame):
         if not fp:
             return
         headers = ["kind", "current_path", "intended_new_path", "actual_new_path_or_preview"]
-        rows = []
+        # Rows are produced while writing rather than built up front
         if self.applied_rows:
-            for old, intended, actual in self.applied_rows:
-                rows.append((_kind_of(old), str(old), str(intended), str(actual)))
+            rows = ((kind, old, intended, actual)
+                    for old, intended, actual, _depth, kind in self.applied_rows)
         else:
-            for old, intended in self.preview_rows:
-                rows.append((_kind_of(old), str(old), str(intended), "(preview)"))
+            rows = ((kind, old, intended, "(preview)")
+                    for old, intended, _key, kind, _status in self.preview_rows)
         try:
-            with open(fp, "w", newline="", encoding="utf-8") as f:
+            with open(fp, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
                 w = csv.writer(f)
                 w.writerow(headers)
                 w.writerows(rows)
@@ -19,8 +19,11 @@ Features:
 UI: bilingual (EN/VI)
 """
 
+import os
 import csv
+import functools
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
@@ -40,28 +43,28 @@ class ThemeManager:
             "button_bg": "#f4a261", "button_active": "#e76f51",
             "accent": "#e9c46a", "heading_bg": "#b5838d",
             "selection_bg": "#e9c46a", "input_bg": "#ffffff", "input_fg": "#2a2a2a",
-            "row_alt": "#fff9f0"
+            "row_alt": "#fff9f0", "tree_bg": "#FFFFFF"
         },
         "Nord Light": {
             "bg": "#ECEFF4", "fg": "#2E3440",
             "button_bg": "#81A1C1", "button_active": "#5E81AC",
             "accent": "#88C0D0", "heading_bg": "#5E81AC",
             "selection_bg": "#D8DEE9", "input_bg": "#FFFFFF", "input_fg": "#2E3440",
-            "row_alt": "#F5F7FA"
+            "row_alt": "#F5F7FA", "tree_bg": "#FFFFFF"
         },
         "Midnight Teal (Dark)": {
             "bg": "#0f172a", "fg": "#e2e8f0",
             "button_bg": "#0ea5e9", "button_active": "#0284c7",
             "accent": "#14b8a6", "heading_bg": "#0ea5e9",
             "selection_bg": "#334155", "input_bg": "#111827", "input_fg": "#e5e7eb",
-            "row_alt": "#0b1224"
+            "row_alt": "#0b1224", "tree_bg": "#0b1224"
         },
         "Solar Slate": {
             "bg": "#f6f7f9", "fg": "#1f2937",
             "button_bg": "#f59e0b", "button_active": "#d97706",
             "accent": "#fbbf24", "heading_bg": "#374151",
             "selection_bg": "#e5e7eb", "input_bg": "#ffffff", "input_fg": "#1f2937",
-            "row_alt": "#f3f4f6"
+            "row_alt": "#f3f4f6", "tree_bg": "#FFFFFF"
         },
     }
 
@@ -72,15 +75,20 @@ class ThemeManager:
             self.style.theme_use("default")
         except tk.TclError:
             pass
+        self._last_applied = None
 
     def apply(self, theme_name: str):
         pal = self.THEMES.get(theme_name, self.THEMES["PharmApp Light"])
+        if theme_name == self._last_applied:
+            return pal  # styles already configured; skip the Tcl round-trips
+        self._last_applied = theme_name
         bg, fg = pal["bg"], pal["fg"]
         head_bg = pal["heading_bg"]
         btn_bg = pal["button_bg"]
         btn_active = pal["button_active"]
         sel_bg = pal["selection_bg"]
         input_bg, input_fg = pal["input_bg"], pal["input_fg"]
+        tree_bg = pal.get("tree_bg", input_bg)
 
         # Window background
         self.root.configure(bg=bg)
@@ -110,8 +118,8 @@ class ThemeManager:
 
         # Treeview
         self.style.configure("Treeview",
-                             background="#FFFFFF" if theme_name != "Midnight Teal (Dark)" else "#0b1224",
-                             fieldbackground="#FFFFFF" if theme_name != "Midnight Teal (Dark)" else "#0b1224",
+                             background=tree_bg,
+                             fieldbackground=tree_bg,
                              foreground=fg,
                              rowheight=25,
                              font=("Arial", 10))
@@ -137,44 +145,119 @@ class ThemeManager:
 
 
 # --------- Name transform helpers ----------
+def _strip_combining(s: str) -> str:
+    # NFD, then drop every mark unicodedata.combining() flags, whatever its block
+    return "".join(ch for ch in unicodedata.normalize("NFD", s) if not unicodedata.combining(ch))
+
+def _build_vi_map() -> dict[str, str]:
+    # Every precomposed Vietnamese letter (vowel x tone, both cases) -> ASCII base
+    table = {"đ": "d", "Đ": "D"}
+    for vowel in "aăâeêioôơuưyAĂÂEÊIOÔƠUƯY":
+        base = _strip_combining(vowel)
+        for tone in ("", "\u0300", "\u0301", "\u0303", "\u0309", "\u0323"):
+            letter = unicodedata.normalize("NFC", vowel + tone)
+            if letter != base:
+                table[letter] = base
+    return table
+
+_VI_MAP = _build_vi_map()
+# '-' (and optionally ' ') -> '_' plus the Vietnamese letters in a single translate
+_TRANS_NOSPACE = str.maketrans({**_VI_MAP, "-": "_"})
+_TRANS_SPACE = str.maketrans({**_VI_MAP, "-": "_", " ": "_"})
+_TRANS_VI = str.maketrans(_VI_MAP)
+
 def remove_vietnamese_diacritics(s: str) -> str:
-    s = s.replace("đ", "d").replace("Đ", "D")
-    nfkd = unicodedata.normalize("NFD", s)
-    return "".join(ch for ch in nfkd if not unicodedata.combining(ch))
+    s = s.translate(_TRANS_VI)
+    if s.isascii():
+        return s
+    return _strip_combining(s)
 
+@functools.lru_cache(maxsize=65536)
 def transform_name(name: str, replace_space: bool) -> str:
-    s = name.replace("-", "_")
-    if replace_space:
-        s = s.replace(" ", "_")
-    s = remove_vietnamese_diacritics(s)
-    s = s.upper()
-    return s
+    # Memoized: basenames like "data" or "images" repeat all over a tree
+    if name.isascii() and name.isupper() and "-" not in name and not (replace_space and " " in name):
+        return name  # already in target form
+    s = name.translate(_TRANS_SPACE if replace_space else _TRANS_NOSPACE)
+    if not s.isascii():
+        # Accents outside the Vietnamese table (or decomposed input)
+        s = _strip_combining(s)
+    return s.upper()
 
 def unique_target_path(target: Path) -> Path:
-    if not target.exists():
+    # lexists: a broken symlink still occupies the name
+    if not os.path.lexists(target):
         return target
     stem = target.name
-    base = target.parent
+    base = os.fspath(target.parent)
     i = 1
     while True:
-        candidate = base / f"{stem}_{i}"
-        if not candidate.exists():
-            return candidate
+        candidate = os.path.join(base, f"{stem}_{i}")
+        if not os.path.lexists(candidate):
+            return Path(candidate)
         i += 1
 
+def is_case_insensitive(folder: Path, names: list[str]) -> bool:
+    # Probe one of the folder's own entries: its case-swapped name reaching
+    # the same object means the filesystem folds case (Windows, default
+    # macOS); missing or another object means it does not. Nothing to probe
+    # -> fold anyway, which can only add a suffix, never allow an overwrite.
+    for name in names:
+        swapped = name.swapcase()
+        if swapped == name or not name.isascii():
+            continue
+        try:
+            st = os.lstat(folder / name)
+        except OSError:
+            continue
+        try:
+            return os.path.samestat(st, os.lstat(folder / swapped))
+        except FileNotFoundError:
+            return False
+        except OSError:
+            continue
+    return True
+
 # --------- Depth options ----------
 DEPTH_LEVEL1_ONLY = "LEVEL1_ONLY"
 DEPTH_LEVEL2_ONLY = "LEVEL2_ONLY"
 DEPTH_UP_TO_LEVEL2 = "UP_TO_LEVEL2"
 DEPTH_ALL = "ALL"
 
-def _rel_depth(base: Path, p: Path) -> int:
-    return len(p.relative_to(base).parts)
+# (min, max) level selected by each mode; None = no limit
+_DEPTH_RANGE = {
+    DEPTH_LEVEL1_ONLY: (1, 1),
+    DEPTH_LEVEL2_ONLY: (2, 2),
+    DEPTH_UP_TO_LEVEL2: (1, 2),
+    DEPTH_ALL: (1, None),
+}
+
+def _walk(dir_str: str, min_depth: int, max_depth: int | None,
+          include_dirs: bool, include_files: bool,
+          acc: list[tuple[int, str, str]], cur_depth: int = 1):
+    # scandir recursion on plain strings; DirEntry answers is_dir/is_file from
+    # the listing, and folders below max_depth are never opened.
+    try:
+        with os.scandir(dir_str) as it:
+            entries = list(it)
+    except OSError:
+        return
+    for entry in entries:
+        if cur_depth >= min_depth:
+            if entry.is_dir():
+                kind, keep = "DIR", include_dirs
+            elif entry.is_file():
+                kind, keep = "FILE", include_files
+            else:
+                kind, keep = "OTHER", True
+            if keep:
+                acc.append((cur_depth, entry.path, kind))
+        if (max_depth is None or cur_depth < max_depth) and entry.is_dir(follow_symlinks=False):
+            _walk(entry.path, min_depth, max_depth, include_dirs, include_files, acc, cur_depth + 1)
 
 def collect_paths_by_depth(base_dir: Path, depth_mode: str,
-                           include_dirs: bool, include_files: bool) -> list[Path]:
+                           include_dirs: bool, include_files: bool) -> list[tuple[Path, str, str, int]]:
     """
-    Returns selected paths under base_dir filtered by depth:
+    Returns selected (path, kind, path_str, depth) under base_dir filtered by depth:
     - LEVEL1_ONLY: depth == 1
     - LEVEL2_ONLY: depth == 2
     - UP_TO_LEVEL2: depth in {1, 2}
@@ -184,73 +267,109 @@ def collect_paths_by_depth(base_dir: Path, depth_mode: str,
     """
     if not base_dir.exists() or not base_dir.is_dir():
         return []
-    all_paths = list(base_dir.rglob("*"))  # includes both files and dirs
-    filtered = []
-    for p in all_paths:
-        try:
-            d = _rel_depth(base_dir, p)
-        except ValueError:
-            continue
-        if d < 1:
-            continue
-        if p.is_dir() and not include_dirs:
-            continue
-        if p.is_file() and not include_files:
-            continue
+    lo, hi = _DEPTH_RANGE.get(depth_mode, (1, None))
+    found: list[tuple[int, str, str]] = []
+    _walk(str(base_dir), lo, hi, include_dirs, include_files, found)
 
-        if depth_mode == DEPTH_LEVEL1_ONLY and d != 1:
-            continue
-        if depth_mode == DEPTH_LEVEL2_ONLY and d != 2:
-            continue
-        if depth_mode == DEPTH_UP_TO_LEVEL2 and d not in (1, 2):
-            continue
-        # DEPTH_ALL: accept all with d>=1
-        filtered.append(p)
-
-    # Deepest-first
-    return sorted(filtered, key=lambda p: len(p.parts), reverse=True)
-
-def compute_plan(paths: list[Path], replace_space: bool) -> list[tuple[Path, Path]]:
-    plan = []
-    for p in paths:
-        new_name = transform_name(p.name, replace_space)
-        if new_name != p.name:
-            plan.append((p, p.with_name(new_name)))
-    return plan
-
-def apply_renames(plan: list[tuple[Path, Path]]) -> list[tuple[Path, Path, Path]]:
-    applied = []
-    for old, intended_new in plan:
+    # Deepest-first on the depth captured during the walk; the walk's own
+    # path string is kept next to the Path
+    found.sort(key=lambda t: t[0], reverse=True)
+    return [(Path(s), kind, s, d) for d, s, kind in found]
+
+def compute_plan(entries: list[tuple[Path, str, str, int]],
+                 replace_space: bool) -> list[tuple[Path, Path, str, str, str, int, str]]:
+    """
+    Returns (old_path, new_path, old_str, new_str, kind, depth, sort_key) for
+    names that change. The walk's path string is old_str; new_str swaps the
+    name by slicing, so the display, sort and CSV code never stringify a Path.
+    sort_key is old_str casefolded once here, not on every display sort.
+    """
+    return [(p, p.with_name(nn), s, s[:len(s) - len(p.name)] + nn, kind, d, s.casefold())
+            for p, kind, s, d in entries
+            for nn in (transform_name(p.name, replace_space),)
+            if nn != p.name]
+
+# rename() is a syscall that releases the GIL, so threads overlap them
+RENAME_WORKERS = 8
+
+def _rename_in_folder(rows: list[tuple[int, Path, Path, str, str, str, int, str]]) -> list[tuple[int, tuple]]:
+    # All rows share one parent folder and no other task touches its names:
+    # list it once and keep the set current as the rows rename into it, so
+    # collisions are set probes, not stat loops. Casefolded where this
+    # folder's filesystem ignores case, like exists() would.
+    folder = rows[0][2].parent
+    try:
+        listing = os.listdir(folder)
+    except OSError:
+        listing = []
+    fold = str.casefold if is_case_insensitive(folder, listing) else (lambda n: n)
+    names = {fold(n) for n in listing}
+    done = []
+    for i, old, intended_new, old_str, new_str, kind, depth, sort_key in rows:
         try:
-            actual_target = intended_new if not intended_new.exists() else unique_target_path(intended_new)
-            old.rename(actual_target)
-            applied.append((old, intended_new, actual_target))
+            stem = name = intended_new.name
+            if fold(name) in names and fold(name) != fold(old.name):
+                n = 1
+                while fold(f"{stem}_{n}") in names:
+                    n += 1
+                name = f"{stem}_{n}"
+            if name == stem:
+                actual_target, actual_str = intended_new, new_str
+            else:
+                actual_target = intended_new.with_name(name)
+                actual_str = new_str[:len(new_str) - len(stem)] + name
+            # No exists() probe: the name set gates POSIX, where rename would
+            # overwrite; Windows refuses instead, e.g. for a name created
+            # after the folder was listed, so fall back to a fresh suffix.
+            try:
+                os.rename(old_str, actual_str)
+            except FileExistsError:
+                actual_target = unique_target_path(intended_new)
+                actual_str, name = os.fspath(actual_target), actual_target.name
+                os.rename(old_str, actual_str)
+            names.discard(fold(old.name))
+            names.add(fold(name))
+            done.append((i, (old, intended_new, actual_target, old_str, new_str, actual_str, kind, depth, sort_key)))
         except Exception as e:
             print(f"[ERROR] Failed to rename '{old}' -> '{intended_new}': {e}")
-    return applied
+    return done
 
-def undo_renames(applied: list[tuple[Path, Path, Path]]) -> list[tuple[Path, Path]]:
+def apply_renames(plan: list[tuple[Path, Path, str, str, str, int, str]],
+                  parallel: bool = False) -> list[tuple[Path, Path, Path, str, str, str, str, int, str]]:
+    if not plan:
+        return []
+    # Deepest level first, so no folder moves while its contents are pending;
+    # within a level each parent folder is one serial task.
+    waves: dict[int, dict[Path, list]] = {}
+    for i, row in enumerate(plan):
+        waves.setdefault(row[5], {}).setdefault(row[0].parent, []).append((i, *row))
+    done = []
+    with ThreadPoolExecutor(max_workers=RENAME_WORKERS if parallel else 1) as pool:
+        for depth in sorted(waves, reverse=True):
+            for rows in pool.map(_rename_in_folder, waves[depth].values()):
+                done.extend(rows)
+    done.sort(key=lambda t: t[0])
+    return [row for _, row in done]
+
+def undo_renames(applied: list[tuple[Path, Path, Path, str, str, str, str, int, str]]) -> list[tuple[str, str, str]]:
     """
-    Undo safely: rename deepest items first, then parents.
+    Undo safely: restore parents first, then their contents. Children were
+    renamed (and recorded) while their parents still had the original names,
+    so those paths only exist again once the parents are back.
     """
     undone = []
-    for old, intended, actual in sorted(applied, key=lambda t: len(t[2].parts), reverse=True):
+    for old, _intended, _actual, _o, _i, actual_str, kind, _depth, _key in sorted(applied, key=lambda t: t[7]):
         try:
-            back_target = old if not old.exists() else unique_target_path(old)
-            actual.rename(back_target)
-            undone.append((actual, back_target))
+            back_str = os.fspath(unique_target_path(old))
+            os.rename(actual_str, back_str)
+            undone.append((actual_str, back_str, kind))
         except Exception as e:
-            print(f"[ERROR] Undo failed '{actual}' -> '{old}': {e}")
+            print(f"[ERROR] Undo failed '{actual_str}' -> '{old}': {e}")
     return undone
 
-def _kind_of(p: Path) -> str:
-    if p.is_dir():
-        return "DIR"
-    if p.is_file():
-        return "FILE"
-    return "OTHER"
-
 # --------- GUI ----------
+INSERT_CHUNK = 500  # Treeview rows inserted per idle callback
+
 class App(ttk.Frame):
     def __init__(self, master):
         super().__init__(master)
@@ -263,10 +382,12 @@ class App(ttk.Frame):
         self.include_dirs = tk.BooleanVar(value=True)   # default: folders
         self.include_files = tk.BooleanVar(value=False) # default: not files
         self.replace_space = tk.BooleanVar(value=True)  # default: replace ' ' -> '_'
+        self.parallel_rename = tk.BooleanVar(value=True) # off for slow/network drives
         self.current_theme = tk.StringVar(value="PharmApp Light")
 
-        self.preview_rows: list[tuple[Path, Path]] = []
-        self.applied_rows: list[tuple[Path, Path, Path]] = []
+        self.preview_rows: list[tuple[Path, Path, str, str, str, int, str]] = []
+        self.applied_rows: list[tuple[Path, Path, Path, str, str, str, str, int, str]] = []
+        self._insert_job = None
 
         # Theme manager must be created before building UI, so styles exist
         self.tm = ThemeManager(master)
@@ -325,6 +446,8 @@ class App(ttk.Frame):
                    command=self._undo_last).pack(side="left", padx=(6,0))
         ttk.Button(actions, text="Save CSV Map", style="Pharm.TButton",
                    command=self._save_csv).pack(side="left", padx=(6,0))
+        ttk.Checkbutton(actions, text="Parallel rename / Đổi tên song song",
+                        variable=self.parallel_rename).pack(side="left", padx=(6,0))
 
         # Table
         table_frame = ttk.Frame(self); table_frame.pack(fill="both", expand=True, padx=10, pady=(6,10))
@@ -376,9 +499,32 @@ class App(ttk.Frame):
             self.selected_dir.set(d)
 
     def _clear_tree(self):
+        if self._insert_job is not None:
+            self.after_cancel(self._insert_job)
+            self._insert_job = None
         for iid in self.tree.get_children():
             self.tree.delete(iid)
 
+    def _insert_rows(self, rows: list[tuple[tuple, str]], start: int = 0):
+        # Insert (values, tag) rows INSERT_CHUNK at a time from idle callbacks
+        # so the window keeps painting and scrolling. Columns are hidden only
+        # while a chunk goes in, so Tk lays out once per chunk and rows show as
+        # they land; Treeview.insert's option formatting is skipped by calling
+        # the widget command (str(tree)) directly.
+        tree = self.tree
+        end = start + INSERT_CHUNK
+        call, w = tree.tk.call, str(tree)
+        tree.configure(displaycolumns=())
+        try:
+            for values, tag in rows[start:end]:
+                call(w, "insert", "", "end", "-values", values, "-tags", tag)
+        finally:
+            tree.configure(displaycolumns="#all")
+        if end < len(rows):
+            self._insert_job = self.after_idle(self._insert_rows, rows, end)
+        else:
+            self._insert_job = None
+
     def _preview(self):
         base = Path(self.selected_dir.get().strip())
         if not base.exists() or not base.is_dir():
@@ -389,34 +535,36 @@ class App(ttk.Frame):
             return
 
         self._clear_tree()
-        paths = collect_paths_by_depth(base,
-                                       self.depth_mode.get(),
-                                       self.include_dirs.get(),
-                                       self.include_files.get())
-        plan = compute_plan(paths, self.replace_space.get())
+        entries = collect_paths_by_depth(base,
+                                         self.depth_mode.get(),
+                                         self.include_dirs.get(),
+                                         self.include_files.get())
+        plan = compute_plan(entries, self.replace_space.get())
         self.preview_rows = plan
         if not plan:
             self.tree.insert("", "end", values=("", str(base), "(unchanged)", "No changes"), tags=("info",))
             return
-        for old, new in sorted(plan, key=lambda t: str(t[0]).lower()):
-            self.tree.insert("", "end",
-                             values=(_kind_of(old), str(old), str(new), "Preview"),
-                             tags=("preview",))
+        # Sorted on the plan's precomputed casefold key; its strings are the values
+        rows = [((kind, old_str, new_str, "Preview"), "preview")
+                for _o, _n, old_str, new_str, kind, _d, _key in sorted(plan, key=lambda t: t[6])]
+        self._insert_rows(rows)
 
     def _rename(self):
         if not self.preview_rows:
             if not self._confirm_scan_then_rename():
                 return
-        applied = apply_renames(self.preview_rows)
+        applied = apply_renames(self.preview_rows, self.parallel_rename.get())
         self.applied_rows = applied
         self._clear_tree()
         if not applied:
             self.tree.insert("", "end", values=("", "", "", "Nothing renamed"), tags=("info",))
             return
-        for old, intended, actual in sorted(applied, key=lambda t: str(t[0]).lower()):
-            status = "Renamed" if actual == intended else "Renamed (conflict ➜ unique path)"
-            tag = "renamed" if actual == intended else "conflict"
-            self.tree.insert("", "end", values=(_kind_of(old), str(old), str(actual), status), tags=(tag,))
+        rows = []
+        for _o, _i, _a, old_str, intended_str, actual_str, kind, _depth, _key in sorted(applied, key=lambda t: t[8]):
+            status = "Renamed" if actual_str == intended_str else "Renamed (conflict ➜ unique path)"
+            tag = "renamed" if actual_str == intended_str else "conflict"
+            rows.append(((kind, old_str, actual_str, status), tag))
+        self._insert_rows(rows)
         messagebox.showinfo("Done", f"Renamed {len(applied)} item(s).")
 
     def _confirm_scan_then_rename(self) -> bool:
@@ -427,11 +575,11 @@ class App(ttk.Frame):
         if not self.include_dirs.get() and not self.include_files.get():
             messagebox.showwarning("Warning", "Select at least one target: Folders or Files.")
             return False
-        paths = collect_paths_by_depth(base,
-                                       self.depth_mode.get(),
-                                       self.include_dirs.get(),
-                                       self.include_files.get())
-        plan = compute_plan(paths, self.replace_space.get())
+        entries = collect_paths_by_depth(base,
+                                         self.depth_mode.get(),
+                                         self.include_dirs.get(),
+                                         self.include_files.get())
+        plan = compute_plan(entries, self.replace_space.get())
         self.preview_rows = plan
         if not plan:
             messagebox.showinfo("Info", "No items need renaming.")
@@ -446,10 +594,9 @@ class App(ttk.Frame):
         undone = undo_renames(self.applied_rows)
         count = len(undone)
         self._clear_tree()
-        for src, dst in sorted(undone, key=lambda t: str(t[0]).lower()):
-            self.tree.insert("", "end",
-                             values=(_kind_of(dst), str(src), str(dst), "Undone"),
-                             tags=("undo",))
+        rows = [((kind, src, dst, "Undone"), "undo") for src, dst, kind in undone]
+        rows.sort(key=lambda r: r[0][1].casefold())
+        self._insert_rows(rows)
         self.applied_rows.clear()
         messagebox.showinfo("Undo", f"Undone {count} item(s).")
 
@@ -465,13 +612,13 @@ class App(ttk.Frame):
         if not fp:
             return
         headers = ["kind", "current_path", "intended_new_path", "actual_new_path_or_preview"]
-        rows = []
+        # Rows are generated while writing; no intermediate copy of the plan
         if self.applied_rows:
-            for old, intended, actual in self.applied_rows:
-                rows.append((_kind_of(old), str(old), str(intended), str(actual)))
+            rows = ((kind, old_str, intended_str, actual_str)
+                    for _o, _i, _a, old_str, intended_str, actual_str, kind, _depth, _key in self.applied_rows)
         else:
-            for old, intended in self.preview_rows:
-                rows.append((_kind_of(old), str(old), str(intended), "(preview)"))
+            rows = ((kind, old_str, new_str, "(preview)")
+                    for _o, _n, old_str, new_str, kind, _d, _key in self.preview_rows)
         try:
             with open(fp, "w", newline="", encoding="utf-8") as f:
                 w = csv.writer(f)
@@ -16,8 +16,10 @@ Themes:
 - PharmApp Light, Nord Light, Midnight Teal (Dark), Solar Slate, macOS Graphite (Dark)
 """
 
+import os
 import csv
 import unicodedata
+from functools import lru_cache
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
@@ -134,103 +136,201 @@ class ThemeManager:
         return pal
 
 # --------- HELPERS ----------
+def _build_diacritic_map() -> dict[int, str | None]:
+    # Precomposed Latin letters (all Vietnamese ones included) -> ASCII base,
+    # and loose combining marks -> dropped
+    table = {ord("đ"): "d", ord("Đ"): "D"}
+    for cp in range(0x300, 0x370):
+        if unicodedata.combining(chr(cp)):
+            table[cp] = None
+    for cp in [*range(0xC0, 0x250), *range(0x1E00, 0x1F00)]:
+        base = "".join(ch for ch in unicodedata.normalize("NFD", chr(cp)) if not unicodedata.combining(ch))
+        if base != chr(cp):
+            table[cp] = base
+    return table
+
+_DIACRITIC_MAP = _build_diacritic_map()
+
 def remove_vietnamese_diacritics(s: str) -> str:
-    s = s.replace("đ", "d").replace("Đ", "D")
+    if s.isascii():
+        return s
+    s = s.translate(_DIACRITIC_MAP)
+    if s.isascii():
+        return s
+    # Accents outside the Latin table (Greek, ...) still go through NFD
     nfkd = unicodedata.normalize("NFD", s)
     return "".join(ch for ch in nfkd if not unicodedata.combining(ch))
 
-def transform_name(name: str, replace_space: bool) -> str:
-    s = name.replace("-", "_")
+def _build_xlate(replace_space: bool) -> dict[int, str | None]:
+    # Every transform rule in one table: '-' (and ' ') -> '_', accents
+    # stripped and a-z uppercased, so a name is scanned exactly once
+    table = {cp: chr(cp).upper() for cp in range(ord("a"), ord("z") + 1)}
+    for cp, base in _DIACRITIC_MAP.items():
+        table[cp] = base.upper() if base else None
+    table[ord("-")] = "_"
     if replace_space:
-        s = s.replace(" ", "_")
-    s = remove_vietnamese_diacritics(s)
-    s = s.upper()
-    return s
+        table[ord(" ")] = "_"
+    return table
+
+_XLATE_SPACE = _build_xlate(True)
+_XLATE_NOSPACE = _build_xlate(False)
 
-def unique_target_path(target: Path) -> Path:
-    if not target.exists():
+@lru_cache(maxsize=8192)
+def _transform_cached(name: str, replace_space: bool) -> str:
+    s = name.translate(_XLATE_SPACE if replace_space else _XLATE_NOSPACE)
+    if s.isascii():
+        return s
+    # Characters outside the table: NFD strip and a full Unicode upper()
+    return remove_vietnamese_diacritics(s).upper()
+
+def transform_name(name: str, replace_space: bool) -> str:
+    # Basenames repeat across a tree and across Preview/Rename/Preview runs
+    return _transform_cached(name, replace_space)
+
+def unique_target_path(target: Path, taken: set[str] | None = None, fold=None) -> Path:
+    # With `taken` (the folder's entry names, passed through `fold`) every
+    # probe is a set lookup instead of an exists() stat
+    if taken is None:
+        exists = Path.exists
+    else:
+        fold = fold or (lambda n: n)
+        exists = lambda p: fold(p.name) in taken
+    if not exists(target):
         return target
     stem = target.name
     base = target.parent
     i = 1
     while True:
         candidate = base / f"{stem}_{i}"
-        if not candidate.exists():
+        if not exists(candidate):
             return candidate
         i += 1
 
+def is_case_insensitive(folder: Path, names: list[str]) -> bool:
+    # Probe one of the folder's own entries: if its case-swapped name stats as
+    # the same object the filesystem folds case (Windows, default macOS); if
+    # it is missing or another object, it does not. With nothing to probe,
+    # fold anyway: that can only add a suffix, never let a rename overwrite.
+    for name in names:
+        swapped = name.swapcase()
+        if swapped == name or not name.isascii():
+            continue
+        try:
+            st = os.lstat(folder / name)
+        except OSError:
+            continue
+        try:
+            return os.path.samestat(st, os.lstat(folder / swapped))
+        except FileNotFoundError:
+            return False
+        except OSError:
+            continue
+    return True
+
 # --------- DEPTH ----------
 DEPTH_LEVEL1_ONLY = "LEVEL1_ONLY"
 DEPTH_LEVEL2_ONLY = "LEVEL2_ONLY"
 DEPTH_UP_TO_LEVEL2 = "UP_TO_LEVEL2"
 DEPTH_ALL = "ALL"
 
-def _rel_depth(base: Path, p: Path) -> int:
-    return len(p.relative_to(base).parts)
+# Deepest level each mode can select; the scan never descends past it
+_DEPTH_LIMIT = {
+    DEPTH_LEVEL1_ONLY: 1,
+    DEPTH_LEVEL2_ONLY: 2,
+    DEPTH_UP_TO_LEVEL2: 2,
+}
+
+def _scan(dir_str: str, max_depth: int | None, depth: int = 1):
+    # Yields (DirEntry, depth); the entries' type comes from the directory
+    # listing, and symlinked folders are not followed (like rglob)
+    try:
+        with os.scandir(dir_str) as it:
+            entries = list(it)
+    except OSError:
+        return
+    for entry in entries:
+        yield entry, depth
+        if (max_depth is None or depth < max_depth) and entry.is_dir(follow_symlinks=False):
+            yield from _scan(entry.path, max_depth, depth + 1)
 
 def collect_paths_by_depth(base_dir: Path, depth_mode: str,
-                           include_dirs: bool, include_files: bool) -> list[Path]:
+                           include_dirs: bool, include_files: bool) -> list[tuple[Path, str]]:
+    # (path, kind) with kind "DIR"/"FILE"/"OTHER" read from the DirEntry,
+    # so nothing downstream has to stat the path again
     if not base_dir.exists() or not base_dir.is_dir():
         return []
-    all_paths = list(base_dir.rglob("*"))
     filtered = []
-    for p in all_paths:
-        try:
-            d = _rel_depth(base_dir, p)
-        except ValueError:
-            continue
-        if d < 1:
-            continue
-        if p.is_dir() and not include_dirs:
-            continue
-        if p.is_file() and not include_files:
-            continue
-        if depth_mode == DEPTH_LEVEL1_ONLY and d != 1:
-            continue
+    for entry, d in _scan(str(base_dir), _DEPTH_LIMIT.get(depth_mode)):
         if depth_mode == DEPTH_LEVEL2_ONLY and d != 2:
             continue
-        if depth_mode == DEPTH_UP_TO_LEVEL2 and d not in (1, 2):
-            continue
-        filtered.append(p)
-    return sorted(filtered, key=lambda p: len(p.parts), reverse=True)
-
-def compute_plan(paths: list[Path], replace_space: bool) -> list[tuple[Path, Path]]:
+        if entry.is_dir():
+            if not include_dirs:
+                continue
+            kind = "DIR"
+        elif entry.is_file():
+            if not include_files:
+                continue
+            kind = "FILE"
+        else:
+            kind = "OTHER"
+        filtered.append((d, Path(entry.path), kind))
+    filtered.sort(key=lambda t: t[0], reverse=True)
+    return [(p, kind) for _, p, kind in filtered]
+
+def _needs_transform(name: str, replace_space: bool) -> bool:
+    # False only for names transform_name would return unchanged (mostly
+    # ones renamed already); the letter scan runs only for non-uppercase names
+    return ("-" in name
+            or (replace_space and " " in name)
+            or not name.isascii()
+            or (not name.isupper() and any(c.isalpha() for c in name)))
+
+def compute_plan(paths: list[tuple[Path, str]], replace_space: bool) -> list[tuple[Path, Path, str]]:
     plan = []
-    for p in paths:
+    for p, kind in paths:
+        if not _needs_transform(p.name, replace_space):
+            continue
         new_name = transform_name(p.name, replace_space)
         if new_name != p.name:
-            plan.append((p, p.with_name(new_name)))
+            plan.append((p, p.with_name(new_name), kind))
     return plan
 
-def apply_renames(plan: list[tuple[Path, Path]]) -> list[tuple[Path, Path, Path]]:
+def apply_renames(plan: list[tuple[Path, Path, str]]) -> list[tuple[Path, Path, Path, str]]:
     applied = []
-    for old, intended_new in plan:
+    if not plan:
+        return applied
+    # Each parent folder is listed (and its case sensitivity probed) once, on
+    # first use, and its name set kept current as the batch renames into it;
+    # casefolded where the filesystem ignores case, as exists() would be
+    existing_by_parent: dict[Path, tuple[set[str], object]] = {}
+    for old, intended_new, kind in plan:
         try:
-            actual_target = intended_new if not intended_new.exists() else unique_target_path(intended_new)
+            parent = intended_new.parent
+            if parent not in existing_by_parent:
+                names = os.listdir(parent)
+                fold = str.casefold if is_case_insensitive(parent, names) else (lambda n: n)
+                existing_by_parent[parent] = ({fold(n) for n in names}, fold)
+            taken, fold = existing_by_parent[parent]
+            actual_target = unique_target_path(intended_new, taken, fold)
             old.rename(actual_target)
-            applied.append((old, intended_new, actual_target))
+            taken.discard(fold(old.name))
+            taken.add(fold(actual_target.name))
+            applied.append((old, intended_new, actual_target, kind))
         except Exception as e:
             print(f"[ERROR] Failed to rename '{old}' -> '{intended_new}': {e}")
     return applied
 
-def undo_renames(applied: list[tuple[Path, Path, Path]]) -> list[tuple[Path, Path]]:
+def undo_renames(applied: list[tuple[Path, Path, Path, str]]) -> list[tuple[Path, Path, str]]:
     undone = []
-    for old, intended, actual in sorted(applied, key=lambda t: len(t[2].parts), reverse=True):
+    for old, intended, actual, kind in sorted(applied, key=lambda t: len(t[2].parts), reverse=True):
         try:
             back_target = old if not old.exists() else unique_target_path(old)
             actual.rename(back_target)
-            undone.append((actual, back_target))
+            undone.append((actual, back_target, kind))
         except Exception as e:
             print(f"[ERROR] Undo failed '{actual}' -> '{old}': {e}")
     return undone
 
-def _kind_of(p: Path) -> str:
-    if p.is_dir():
-        return "DIR"
-    if p.is_file():
-        return "FILE"
-    return "OTHER"
-
 # --------- LANGUAGE PACKS ----------
 LANG = {
     "EN": {
@@ -406,8 +506,11 @@ class App(ttk.Frame):
         self.replace_space = tk.BooleanVar(value=True)
         self.current_theme = tk.StringVar(value="macOS Graphite (Dark)")
 
-        self.preview_rows: list[tuple[Path, Path]] = []
-        self.applied_rows: list[tuple[Path, Path, Path]] = []
+        self.preview_rows: list[tuple[Path, Path, str]] = []
+        self.applied_rows: list[tuple[Path, Path, Path, str]] = []
+        # Table contents as (values, tag); only a viewport's worth is in the Treeview
+        self._view_rows: list[tuple[tuple, str]] = []
+        self._view_top = 0
 
         # Theme manager
         self.tm = ThemeManager(master)
@@ -513,9 +616,16 @@ class App(ttk.Frame):
         self.tree.heading("current", text="")
         self.tree.heading("new", text="")
         self.tree.heading("status", text="")
-        y_scroll = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        # Vertical scrolling is virtual: the scrollbar moves through _view_rows
+        # and the few Treeview items are refilled (see _render_rows)
+        self.y_scroll = y_scroll = ttk.Scrollbar(table_frame, orient="vertical", command=self._on_yview)
         x_scroll = ttk.Scrollbar(table_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
+        self.tree.configure(xscrollcommand=x_scroll.set)
+        self.tree.bind("<Configure>", lambda e: self._render_rows())
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(seq, self._on_wheel)
+        for seq in ("<Up>", "<Down>", "<Prior>", "<Next>", "<Home>", "<End>"):
+            self.tree.bind(seq, self._on_key)
         self.tree.grid(row=0, column=0, sticky="nsew")
         y_scroll.grid(row=0, column=1, sticky="ns")
         x_scroll.grid(row=1, column=0, sticky="ew")
@@ -526,6 +636,10 @@ class App(ttk.Frame):
         foot = ttk.Frame(self); foot.pack(fill="x", padx=10, pady=(0,10))
         self.status_lbl = ttk.Label(foot, text="")
         self.status_lbl.pack(side="left")
+        # Non-modal result notices (renamed/undone counts)
+        self.toast_lbl = ttk.Label(foot, text="")
+        self.toast_lbl.pack(side="right")
+        self._toast_job = None
         self._update_status()
 
     def _apply_theme(self):
@@ -595,6 +709,18 @@ class App(ttk.Frame):
             text=f"{L['status_script']}: {SCRIPT_NAME} • {L['status_theme']}: {self.current_theme.get()} • Lang: {self.lang.get()}"
         )
 
+    def _toast(self, text: str, ms: int = 3000):
+        # Shown in the footer instead of a modal, so the results table can be
+        # scrolled right away; a newer notice restarts the timer
+        if self._toast_job is not None:
+            self.after_cancel(self._toast_job)
+        self.toast_lbl.config(text=text)
+        self._toast_job = self.after(ms, self._clear_toast)
+
+    def _clear_toast(self):
+        self._toast_job = None
+        self.toast_lbl.config(text="")
+
     # ---------- ACTIONS ----------
     def _browse(self):
         d = filedialog.askdirectory(title=self.L()["base_folder"])
@@ -602,9 +728,91 @@ class App(ttk.Frame):
             self.selected_dir.set(d)
 
     def _clear_tree(self):
+        self._view_rows = []
+        self._view_top = 0
         for iid in self.tree.get_children():
             self.tree.delete(iid)
 
+    # ---------- VIRTUAL TABLE ----------
+    def _visible_count(self) -> int:
+        row_h = int(self.tm.style.lookup("Treeview", "rowheight") or 25)
+        return max(1, self.tree.winfo_height() // row_h - 1)  # minus the heading
+
+    def _show_rows(self, rows: list[tuple[tuple, str]]):
+        self._view_rows = rows
+        self._view_top = 0
+        self._render_rows()
+
+    def _render_rows(self):
+        # Keep one Treeview item per visible line and refill them from
+        # _view_rows[_view_top:]; Tk never holds more than a screenful.
+        rows = self._view_rows
+        n = len(rows)
+        count = min(n, self._visible_count())
+        top = self._view_top = max(0, min(self._view_top, n - count))
+        # Columns hidden while the items change, so Tk redraws once
+        self.tree.configure(displaycolumns=())
+        try:
+            items = self.tree.get_children()
+            if len(items) > count:
+                self.tree.delete(*items[count:])
+            for _ in range(len(items), count):
+                self.tree.insert("", "end")
+            self.tree.selection_remove(self.tree.selection())
+            for iid, (values, tag) in zip(self.tree.get_children(), rows[top:top + count]):
+                self.tree.item(iid, values=values, tags=(tag,))
+        finally:
+            self.tree.configure(displaycolumns="#all")
+        if n:
+            self.y_scroll.set(top / n, (top + count) / n)
+        else:
+            self.y_scroll.set(0.0, 1.0)
+
+    def _on_yview(self, *args):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"|"pages")
+        if args[0] == "moveto":
+            self._view_top = int(float(args[1]) * len(self._view_rows))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self._view_top += step * self._visible_count() if args[2] == "pages" else step
+        self._render_rows()
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self._on_yview("scroll", -3, "units")
+        else:
+            self._on_yview("scroll", 3, "units")
+        return "break"
+
+    def _on_key(self, event):
+        # Treeview only walks the pooled items; at their edge (and for page /
+        # Home / End) move _view_top instead and keep the focus on that line
+        items = self.tree.get_children()
+        if not items:
+            return None
+        focus = self.tree.focus()
+        pos = items.index(focus) if focus in items else 0
+        key = event.keysym
+        if key == "Up" and pos == 0:
+            self._on_yview("scroll", -1, "units")
+        elif key == "Down" and pos == len(items) - 1:
+            self._on_yview("scroll", 1, "units")
+        elif key in ("Prior", "Next"):
+            self._on_yview("scroll", -1 if key == "Prior" else 1, "pages")
+        elif key == "Home":
+            self._on_yview("moveto", 0)
+            pos = 0
+        elif key == "End":
+            self._on_yview("moveto", 1)
+            pos = len(items) - 1
+        else:
+            return None
+        items = self.tree.get_children()
+        iid = items[min(pos, len(items) - 1)]
+        self.tree.focus(iid)
+        self.tree.selection_set(iid)
+        return "break"
+
     def _preview(self):
         L = self.L()
         base = Path(self.selected_dir.get().strip())
@@ -623,12 +831,12 @@ class App(ttk.Frame):
         plan = compute_plan(paths, self.replace_space.get())
         self.preview_rows = plan
         if not plan:
-            self.tree.insert("", "end", values=("", str(base), "(unchanged)", L["no_changes"]), tags=("info",))
+            self._show_rows([(("", str(base), "(unchanged)", L["no_changes"]), "info")])
             return
-        for old, new in sorted(plan, key=lambda t: str(t[0]).lower()):
-            self.tree.insert("", "end",
-                             values=(_kind_of(old), str(old), str(new), "Preview"),
-                             tags=("preview",))
+        # Strings and the lowercase sort key are built once per row, then sorted as tuples
+        keyed = sorted((str(old).lower(), str(old), str(new), kind) for old, new, kind in plan)
+        self._show_rows([((kind, old_s, new_s, "Preview"), "preview")
+                         for _key, old_s, new_s, kind in keyed])
 
     def _confirm_scan_then_rename(self) -> bool:
         L = self.L()
@@ -660,13 +868,17 @@ class App(ttk.Frame):
         self.applied_rows = applied
         self._clear_tree()
         if not applied:
-            self.tree.insert("", "end", values=("", "", "", L["nothing_renamed"]), tags=("info",))
+            self._show_rows([(("", "", "", L["nothing_renamed"]), "info")])
             return
-        for old, intended, actual in sorted(applied, key=lambda t: str(t[0]).lower()):
-            status = "Renamed" if actual == intended else "Renamed (conflict ➜ unique path)"
-            tag = "renamed" if actual == intended else "conflict"
-            self.tree.insert("", "end", values=(_kind_of(old), str(old), str(actual), status), tags=(tag,))
-        messagebox.showinfo(L["msg_info"], L["renamed_n"].format(n=len(applied)))
+        rows = []
+        keyed = sorted((str(old).lower(), str(old), str(actual), actual == intended, kind)
+                       for old, intended, actual, kind in applied)
+        for _key, old_s, actual_s, clean, kind in keyed:
+            status = "Renamed" if clean else "Renamed (conflict ➜ unique path)"
+            tag = "renamed" if clean else "conflict"
+            rows.append(((kind, old_s, actual_s, status), tag))
+        self._show_rows(rows)
+        self._toast(L["renamed_n"].format(n=len(applied)))
 
     def _undo_last(self):
         L = self.L()
@@ -676,12 +888,11 @@ class App(ttk.Frame):
         undone = undo_renames(self.applied_rows)
         count = len(undone)
         self._clear_tree()
-        for src, dst in sorted(undone, key=lambda t: str(t[0]).lower()):
-            self.tree.insert("", "end",
-                             values=(_kind_of(dst), str(src), str(dst), "Undone"),
-                             tags=("undo",))
+        keyed = sorted((str(src).lower(), str(src), str(dst), kind) for src, dst, kind in undone)
+        self._show_rows([((kind, src_s, dst_s, "Undone"), "undo")
+                         for _key, src_s, dst_s, kind in keyed])
         self.applied_rows.clear()
-        messagebox.showinfo(L["msg_info"], L["undone_n"].format(n=count))
+        self._toast(L["undone_n"].format(n=count))
 
     def _save_csv(self):
         L = self.L()
@@ -696,13 +907,13 @@ class App(ttk.Frame):
         if not fp:
             return
         headers = ["kind", "current_path", "intended_new_path", "actual_new_path_or_preview"]
-        rows = []
+        # Generated row by row while writing; no copy of the whole plan
         if self.applied_rows:
-            for old, intended, actual in self.applied_rows:
-                rows.append((_kind_of(old), str(old), str(intended), str(actual)))
+            rows = ((kind, str(old), str(intended), str(actual))
+                    for old, intended, actual, kind in self.applied_rows)
         else:
-            for old, intended in self.preview_rows:
-                rows.append((_kind_of(old), str(old), str(intended), "(preview)"))
+            rows = ((kind, str(old), str(intended), "(preview)")
+                    for old, intended, kind in self.preview_rows)
         try:
             with open(fp, "w", newline="", encoding="utf-8") as f:
                 w = csv.writer(f)
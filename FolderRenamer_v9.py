@@ -16,6 +16,7 @@ import csv
 import hashlib
 import unicodedata
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
@@ -219,17 +220,38 @@ CONFLICT_DELETE = "DELETE"   # delete existing target then rename
 CONFLICT_MERGE  = "MERGE"    # merge into existing (NEW)
 
 def _sha256_file(fp: Path) -> str:
+    if hasattr(hashlib, "file_digest"):
+        # Python 3.11+: file_digest releases the GIL and uses OpenSSL's (SHA-NI) path
+        with open(fp, "rb", buffering=0) as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    # Older Pythons: chunked update()
     h = hashlib.sha256()
     with open(fp, "rb") as f:
         for chunk in iter(lambda: f.read(1024 * 1024), b""):
             h.update(chunk)
     return h.hexdigest()
 
+# digest per (dev, ino, size, mtime_ns): a merge target hit by many sources is read once
+_DIGEST_CACHE: dict[tuple[int, int, int, int], str] = {}
+_HASH_POOL = ThreadPoolExecutor(max_workers=2)
+
+def _cached_sha256(fp: Path, st=None) -> str:
+    st = st or fp.stat()
+    key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+    digest = _DIGEST_CACHE.get(key)
+    if digest is None:
+        digest = _DIGEST_CACHE[key] = _sha256_file(fp)
+    return digest
+
 def _files_identical(a: Path, b: Path) -> bool:
     try:
-        if a.stat().st_size != b.stat().st_size:
+        sa, sb = a.stat(), b.stat()
+        if sa.st_size != sb.st_size:
             return False
-        return _sha256_file(a) == _sha256_file(b)
+        # hash both sides at once so the two reads overlap
+        fut = _HASH_POOL.submit(_cached_sha256, a, sa)
+        digest_b = _cached_sha256(b, sb)
+        return fut.result() == digest_b
     except Exception:
         return False
 
@@ -319,6 +341,7 @@ def apply_renames(plan: list[tuple[Path, Path, Path]], conflict_mode: str = CONF
     op in {"rename","conflict_unique","delete_then_rename","merge","merge_skip_identical","merge_unique","error"}
     """
     applied = []
+    _DIGEST_CACHE.clear()
     for base, old, intended_new in plan:
         try:
             if conflict_mode == CONFLICT_DELETE and intended_new.exists():